@@ -1,8 +1,30 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime
-import io
+import cProfile
+import json
+import os
+import tempfile
+
+from finance_core import HAS_PYARROW, create_ingest_pool, amounts
+from finance_core.cache import IngestCache, SharedDatasetCache, dataset_digest
+from finance_core.categorize import (
+    DEFAULT_CATEGORY_RULES, CategoryRules, categorize_transactions, load_category_rules
+)
+from finance_core.cube import (
+    build_aggregate_cube, cube_years, year_totals, monthly_expenses,
+    category_expenses, source_file_summary
+)
+from finance_core.dateindex import DateIndex
+from finance_core.diagnostics import ERROR, WARNING, FileDiagnostic, StageRecorder, recording, stage
+from finance_core.explorer import EXPLORER_COLUMNS, TransactionIndex
+from finance_core.pipeline import IngestResult, ingest_files, ingest_into_store
+from finance_core.spool import SpooledFile, UploadSpool, source_digest
+from finance_core.store import TransactionStore, read_partition
+from finance_core.transactions import MONTH_NAMES
+from finance_core.trends import TREND_FREQUENCIES, TREND_MAX_POINTS, downsample_minmax, spending_trend
 
 # Page Configuration
 st.set_page_config(
@@ -12,409 +34,439 @@ st.set_page_config(
 )
 
 # ============================================================================
-# TARGET SCHEMA - All files will be normalized to this structure
+# DATA LOADING - thin Streamlit layer over the finance_core pipeline
 # ============================================================================
-TARGET_SCHEMA = ['date', 'description', 'amount', 'category', 'source_file']
-
-# Column mapping: maps various bank column names to our target schema
-COLUMN_MAPPINGS = {
-    'date': [
-        'transaction date', 'transactiondate', 'trans date', 'date', 
-        'post date', 'postdate', 'posted date', 'posteddate'
-    ],
-    'description': [
-        'description', 'desc', 'details', 'merchant', 'vendor', 
-        'name', 'payee', 'memo', 'transaction description'
-    ],
-    'amount': [
-        'amount', 'amt', 'transaction amount', 'transactionamount'
-    ],
-    'category': [
-        'category', 'cat', 'type', 'transaction type', 'transactiontype'
-    ],
-    'debit': ['debit', 'debits', 'withdrawal', 'withdrawals'],
-    'credit': ['credit', 'credits', 'deposit', 'deposits']
-}
+# Worker processes for ingesting uncached files; 1 = serial, 0 = one per CPU core
+INGEST_WORKERS = int(os.environ.get('FINANCE_APP_INGEST_WORKERS', '1'))
+STORE_DIR = os.environ.get('FINANCE_APP_STORE_DIR', '')
+# Profile each script run with cProfile and dump pstats to PROFILE_PATH
+PROFILE = os.environ.get('FINANCE_APP_PROFILE', '').lower() in ('1', 'true', 'yes')
+PROFILE_PATH = os.environ.get('FINANCE_APP_PROFILE_PATH',
+                              os.path.join(tempfile.gettempdir(), 'finance_app.pstats'))
+# JSON/YAML category rules, re-read whenever the file changes
+RULES_FILE = os.environ.get('FINANCE_APP_RULES_FILE', '')
 
-# ============================================================================
-# CATEGORIZATION LOGIC
-# ============================================================================
-CATEGORY_DEFINITIONS = {
-    'Utilities': {
-        'keywords': ['ELECTRIC', 'WATER', 'GAS', 'INTERNET', 'PHONE', 'CELLULAR', 'MOBILE',
-            'SHELL', 'CHEVRON', 'EXXON', 'BP', 'ARCO', 'VALERO', 'GAS STATION',
-            'POWER', 'UTILITY', 'PG&E', 'EDISON', 'CON EDISON', 'DUKE ENERGY',
-            'AT&T', 'VERIZON', 'T-MOBILE', 'SPRINT', 'COMCAST', 'XFINITY',
-            'SPECTRUM', 'COX', 'OPTIMUM', 'CABLE', 'INTERNET SERVICE'],
-        'description': 'Monthly utilities: electricity, water, gas, internet, phone, cable'
-    },
-    'Entertainment': {
-        'keywords': ['NETFLIX', 'SPOTIFY', 'DISNEY', 'HULU', 'AMAZON PRIME', 'APPLE TV',
-            'YOUTUBE PREMIUM', 'PARAMOUNT', 'HBO', 'MAX', 'PEACOCK', 'SHOWTIME',
-            'CINEMA', 'MOVIE', 'THEATER', 'AMC', 'REGAL', 'CINEMARK',
-            'CONCERT', 'TICKETMASTER', 'STUBHUB', 'EVENTBRITE',
-            'GAME', 'STEAM', 'PLAYSTATION', 'XBOX', 'NINTENDO',
-            'MUSIC', 'APPLE MUSIC', 'PANDORA', 'AUDIBLE', 'BOOKS'],
-        'description': 'Streaming, movies, concerts, games, entertainment subscriptions'
-    },
-    'Travel': {
-        'keywords': ['HOTEL', 'MOTEL', 'AIRBNB', 'VRBO', 'RESORT', 'LODGING',
-            'AIRLINE', 'DELTA', 'UNITED', 'AMERICAN AIRLINES', 'SOUTHWEST',
-            'JETBLUE', 'ALASKA AIR', 'FRONTIER', 'SPIRIT',
-            'UBER', 'LYFT', 'TAXI', 'RIDESHARE', 'TRANSPORTATION',
-            'BOOKING', 'EXPEDIA', 'TRIVAGO', 'KAYAK', 'PRICELINE',
-            'RENTAL CAR', 'HERTZ', 'ENTERPRISE', 'AVIS', 'BUDGET',
-            'TRAVEL', 'VACATION', 'TRIP', 'FLIGHT', 'AIRPORT'],
-        'description': 'Hotels, flights, car rentals, rideshares, travel expenses'
-    },
-    'Clothes & Shoes': {
-        'keywords': ['ZARA', 'NIKE', 'UNIQLO', 'MACY', "MACY'S", 'H&M', 'ADIDAS',
-            'OLD NAVY', 'GAP', 'NORDSTROM', 'BLOOMINGDALE', 'SAKS',
-            'FOOT LOCKER', 'FINISH LINE', 'DSW', 'SHOE',
-            'CLOTHING', 'APPAREL', 'FASHION', 'OUTFIT',
-            'BANANA REPUBLIC', 'J.CREW', 'ABERCROMBIE', 'HOLLISTER',
-            'LULULEMON', 'ATHLETA', 'UNDER ARMOUR', 'PUMA', 'REEBOK'],
-        'description': 'Clothing, shoes, accessories, fashion purchases'
-    },
-    'Groceries': {
-        'keywords': ['WHOLE FOODS', 'TRADER JOE', "TRADER JOE'S", 'COSTCO', 'KROGER',
-            'SAFEWAY', 'ALBERTSONS', 'VONS', 'RALPHS', 'FOOD LION',
-            'PUBLIX', 'WEGMANS', 'H-E-B', 'WINN-DIXIE', 'GIANT',
-            'STOP & SHOP', 'SHOPRITE', 'MEIJER', 'HY-VEE',
-            'GROCERY', 'SUPERMARKET', 'MARKET', 'FOOD STORE',
-            'SPROUTS', 'FRESH MARKET', 'WHOLE FOODS MARKET', 'ALDI', 'LIDL'],
-        'description': 'Grocery shopping, food purchases, household essentials'
-    },
-    'Dining': {
-        'keywords': ['RESTAURANT', 'CAFE', 'COFFEE', 'STARBUCKS', 'DUNKIN',
-            'MCDONALD', 'BURGER KING', 'WENDY', 'TACO BELL',
-            'CHIPOTLE', 'PANERA', 'SUBWAY', 'DOMINO', 'PIZZA',
-            'DINING', 'EAT', 'FOOD', 'LUNCH', 'DINNER', 'BREAKFAST',
-            'GRUBHUB', 'DOORDASH', 'UBER EATS', 'POSTMATES',
-            'BAKERY', 'DELI', 'FAST FOOD'],
-        'description': 'Restaurant meals, coffee shops, fast food, food delivery'
-    },
-    'Healthcare': {
-        'keywords': ['PHARMACY', 'CVS', 'WALGREENS', 'RITE AID',
-            'DOCTOR', 'HOSPITAL', 'MEDICAL', 'HEALTH', 'CLINIC',
-            'DENTIST', 'DENTAL', 'VISION', 'OPTICAL', 'EYE',
-            'INSURANCE', 'HEALTH INSURANCE', 'MEDICAL BILL',
-            'PRESCRIPTION', 'MEDICATION', 'DRUG STORE'],
-        'description': 'Medical expenses, prescriptions, doctor visits, dental, vision'
-    },
-    'Home & Garden': {
-        'keywords': ['HOME DEPOT', 'LOWE', "LOWE'S", 'HARDWARE', 'HOME IMPROVEMENT',
-            'IKEA', 'WAYFAIR', 'OVERSTOCK', 'BED BATH',
-            'FURNITURE', 'DECOR', 'GARDEN', 'LANDSCAPING', 'LAWN',
-            'PAINT', 'TOOL', 'APPLIANCE'],
-        'description': 'Home improvement, furniture, appliances, gardening'
-    },
-    'Shopping': {
-        'keywords': ['AMAZON', 'EBAY', 'ETSY', 'ONLINE', 'SHOPPING',
-            'TARGET', 'WALMART', 'DEPARTMENT STORE', 'RETAIL', 'STORE'],
-        'description': 'General shopping and retail purchases'
-    },
-    'Transportation': {
-        'keywords': ['METRO', 'SUBWAY', 'BUS', 'TRANSIT', 'PUBLIC TRANSPORT',
-            'PARKING', 'TOLL', 'EZPASS', 'FASTRAK',
-            'CAR WASH', 'AUTO REPAIR', 'MECHANIC', 'OIL CHANGE',
-            'TIRE', 'AUTO PARTS', 'NAPA', 'AUTOZONE'],
-        'description': 'Public transit, parking, tolls, car maintenance'
-    }
-}
 
-def categorize_transaction(description: str, original_category: str = '') -> str:
-    """Categorize a transaction based on description keywords."""
-    desc_upper = str(description).upper()
-    
-    # Priority 1: Keyword match in description
-    for category, info in CATEGORY_DEFINITIONS.items():
-        for keyword in info['keywords']:
-            if keyword in desc_upper:
-                return category
-    
-    # Priority 2: Map original category if provided
-    category_mapping = {
-        'BILLS & UTILITIES': 'Utilities', 'UTILITIES': 'Utilities',
-        'GROCERIES': 'Groceries', 'GROCERY': 'Groceries',
-        'GAS': 'Utilities', 'GAS & FUEL': 'Utilities',
-        'ENTERTAINMENT': 'Entertainment', 'TRAVEL': 'Travel',
-        'SHOPPING': 'Shopping', 'DINING': 'Dining',
-        'FOOD & DINING': 'Dining', 'HEALTHCARE': 'Healthcare',
-        'MEDICAL': 'Healthcare', 'HOME & GARDEN': 'Home & Garden',
-        'TRANSPORTATION': 'Transportation', 'AUTO & TRANSPORT': 'Transportation'
-    }
-    
-    orig_upper = str(original_category).upper().strip()
-    if orig_upper in category_mapping:
-        return category_mapping[orig_upper]
-    
-    # Priority 3: Return original if valid, else 'Other'
-    if original_category and original_category.strip() and original_category.lower() != 'nan':
-        return original_category.strip().title()
-    
-    return 'Other'
+@st.cache_resource(show_spinner=False)
+def get_ingest_cache() -> IngestCache:
+    """Process-wide ingest cache shared by all reruns and sessions."""
+    return IngestCache()
 
 
-# ============================================================================
-# CORE DATA LOADING - NORMALIZE EACH FILE INDEPENDENTLY
-# ============================================================================
+@st.cache_resource(show_spinner=False)
+def get_ingest_pool():
+    """Process pool shared by all sessions, or None when ingest runs serially."""
+    if INGEST_WORKERS == 1:
+        return None
+    return create_ingest_pool(INGEST_WORKERS)
+
+
+@st.cache_resource(show_spinner=False)
+def get_transaction_store() -> TransactionStore | None:
+    """The persistent store, if FINANCE_APP_STORE_DIR is set and pyarrow is installed."""
+    if not STORE_DIR or not HAS_PYARROW:
+        return None
+    return TransactionStore(STORE_DIR)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_rules_file(path: str, mtime_ns: int) -> CategoryRules:
+    """Compiled rules for one version (mtime) of the rules file."""
+    return load_category_rules(path)
+
 
-def find_column(df_columns: list, target_names: list) -> str | None:
-    """Find a column matching any of the target names (case-insensitive)."""
-    df_cols_lower = {col.lower().strip(): col for col in df_columns}
-    for target in target_names:
-        if target.lower() in df_cols_lower:
-            return df_cols_lower[target.lower()]
-    return None
-
-
-def clean_amount(value) -> float:
-    """Convert amount string to float, handling currency symbols and parentheses."""
-    if pd.isna(value):
-        return 0.0
-    val_str = str(value).strip()
-    # Remove currency symbols and commas
-    val_str = val_str.replace('$', '').replace(',', '').strip()
-    # Handle parentheses as negative (accounting format)
-    if val_str.startswith('(') and val_str.endswith(')'):
-        val_str = '-' + val_str[1:-1]
+def current_category_rules() -> CategoryRules:
+    """Rules from FINANCE_APP_RULES_FILE as of now, or the built-in rules."""
+    if not RULES_FILE:
+        return DEFAULT_CATEGORY_RULES
     try:
-        return float(val_str)
-    except ValueError:
-        return 0.0
+        return load_rules_file(RULES_FILE, os.stat(RULES_FILE).st_mtime_ns)
+    except (OSError, ValueError) as e:
+        st.sidebar.error(f"❌ Category rules not loaded, using built-in rules: {e}")
+        return DEFAULT_CATEGORY_RULES
 
 
-def normalize_single_file(df: pd.DataFrame, filename: str) -> pd.DataFrame:
+@st.cache_resource(show_spinner=False)
+def get_shared_cache() -> SharedDatasetCache:
     """
-    Normalize a single dataframe to the target schema.
-    This is the CRITICAL function that ensures all files have identical columns.
+    Datasets and aggregates shared by all sessions: users opening the same
+    statements share one read-only copy, within FINANCE_APP_SHARED_CACHE_MB.
     """
-    normalized = pd.DataFrame()
-    
-    # --- 1. Find and normalize DATE column ---
-    date_col = find_column(df.columns, COLUMN_MAPPINGS['date'])
-    if date_col:
-        # Try multiple date formats
-        date_formats = ['%m/%d/%Y', '%Y-%m-%d', '%m-%d-%Y', '%d/%m/%Y', 
-                       '%m/%d/%y', '%Y/%m/%d', '%m/%d/%Y %H:%M:%S']
-        parsed = None
-        for fmt in date_formats:
-            try:
-                parsed = pd.to_datetime(df[date_col], format=fmt, errors='coerce')
-                if parsed.notna().sum() > len(df) * 0.5:  # >50% success
-                    break
-            except:
-                continue
-        if parsed is None or parsed.isna().all():
-            parsed = pd.to_datetime(df[date_col], errors='coerce')
-        normalized['date'] = parsed
-    else:
-        # Try to infer date column from data patterns
-        for col in df.columns:
-            sample = df[col].dropna().head(10).astype(str)
-            if sample.str.contains(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}').mean() > 0.5:
-                normalized['date'] = pd.to_datetime(df[col], errors='coerce')
-                break
-        if 'date' not in normalized.columns:
-            normalized['date'] = pd.NaT  # Fill with NaT if no date found
-    
-    # --- 2. Find and normalize DESCRIPTION column ---
-    desc_col = find_column(df.columns, COLUMN_MAPPINGS['description'])
-    if desc_col:
-        normalized['description'] = df[desc_col].fillna('').astype(str)
-    else:
-        normalized['description'] = 'Unknown'
-    
-    # --- 3. Find and normalize AMOUNT column ---
-    amount_col = find_column(df.columns, COLUMN_MAPPINGS['amount'])
-    debit_col = find_column(df.columns, COLUMN_MAPPINGS['debit'])
-    credit_col = find_column(df.columns, COLUMN_MAPPINGS['credit'])
-    
-    if amount_col:
-        normalized['amount'] = df[amount_col].apply(clean_amount)
-    elif debit_col and credit_col:
-        # Debit/Credit format (Capital One, some banks)
-        debits = df[debit_col].apply(clean_amount)
-        credits = df[credit_col].apply(clean_amount)
-        normalized['amount'] = credits - debits  # Credits positive, debits negative
-    elif debit_col:
-        normalized['amount'] = -df[debit_col].apply(clean_amount)  # Debits as negative
-    elif credit_col:
-        normalized['amount'] = df[credit_col].apply(clean_amount)
-    else:
-        # Try to find any numeric column that looks like amounts
-        for col in df.columns:
-            if col.lower() in ['date', 'description', 'category', 'type', 'memo']:
-                continue
-            sample = df[col].dropna().head(20)
-            try:
-                cleaned = sample.apply(clean_amount)
-                if cleaned.abs().mean() > 0.01 and cleaned.abs().mean() < 1000000:
-                    normalized['amount'] = df[col].apply(clean_amount)
-                    break
-            except:
-                continue
-        if 'amount' not in normalized.columns:
-            normalized['amount'] = 0.0
-    
-    # --- 4. Find and normalize CATEGORY column ---
-    cat_col = find_column(df.columns, COLUMN_MAPPINGS['category'])
-    if cat_col:
-        normalized['category'] = df[cat_col].fillna('Other').astype(str)
-    else:
-        normalized['category'] = 'Other'
-    
-    # --- 5. Add source file tracking ---
-    normalized['source_file'] = filename
-    
-    # --- 6. Apply smart categorization ---
-    normalized['processed_category'] = normalized.apply(
-        lambda row: categorize_transaction(row['description'], row['category']), axis=1
-    )
-    
-    return normalized
+    return SharedDatasetCache()
+
+
+def get_ingested_dataset(dataset_key: str, file_contents: list[tuple[str, str]],
+                         digests: list[str]) -> IngestResult:
+    """Merged, uncategorized transactions for a set of uploads, built once per dataset_key."""
+    return get_shared_cache().get_or_build('ingested', dataset_key, lambda: ingest_files(
+        file_contents, digests, cache=get_ingest_cache(), executor=get_ingest_pool(), rules=None
+    ))
+
+
+def get_categorized_dataset(dataset_key: str, rules_digest: str, data: pd.DataFrame,
+                            rules: CategoryRules) -> pd.DataFrame:
+    """A dataset categorized with one rule set; editing rules re-runs only this step."""
+    return get_shared_cache().get_or_build('categorized', dataset_digest([dataset_key, rules_digest]),
+                                           lambda: categorize_transactions(data, rules))
+
+
+def load_store_year(partition_files: list[str]) -> pd.DataFrame:
+    """Read one year from the store; re-read only when that partition changes."""
+    return get_shared_cache().get_or_build('store_year', dataset_digest(partition_files),
+                                           lambda: read_partition(partition_files))
+
+
+def get_aggregate_cube(dataset_key: str, data: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate cube for a dataset, built once per dataset_key."""
+    return get_shared_cache().get_or_build('cube', dataset_key, lambda: build_aggregate_cube(data))
+
+
+def get_transaction_index(dataset_key: str, data: pd.DataFrame) -> TransactionIndex:
+    """Explorer index for a dataset, built once per dataset_key and shared read-only."""
+    return get_shared_cache().get_or_build('explorer_index', dataset_key, lambda: TransactionIndex(data))
+
 
+def get_date_index(dataset_key: str, data: pd.DataFrame) -> DateIndex:
+    """Date index (range slicing, prefix sums) for a dataset, built once per dataset_key and shared."""
+    return get_shared_cache().get_or_build('date_index', dataset_key, lambda: DateIndex(data))
 
-@st.cache_data(show_spinner=False)
-def load_and_process_data(file_contents: list[tuple[str, bytes]]) -> pd.DataFrame | None:
+
+def spool_uploads(uploaded_files) -> list[SpooledFile]:
     """
-    Load and process multiple CSV files.
-    
-    CRITICAL: Each file is normalized INDEPENDENTLY before merging.
-    This prevents schema conflicts from causing data loss.
+    This session's uploads as spooled files. Each upload is copied and hashed
+    once; reruns with the same uploads do no work on their bytes.
+    """
+    if 'upload_spool' not in st.session_state:
+        st.session_state.upload_spool = UploadSpool()
+    return st.session_state.upload_spool.sync([(f.file_id, f.name, f) for f in uploaded_files or []])
+
+
+def show_diagnostics(diagnostics: list[FileDiagnostic], verb: str = "Loaded") -> None:
+    """Show per-file results: successes first, then warnings and errors."""
+    for diagnostic in diagnostics:
+        if diagnostic.ok:
+            message = f"✅ {diagnostic.filename}: {verb} {diagnostic.rows - diagnostic.duplicates} transactions"
+            if diagnostic.duplicates:
+                message += f" ({diagnostic.duplicates} already in another file skipped)"
+            st.success(message)
+    for diagnostic in diagnostics:
+        if diagnostic.status == WARNING:
+            st.warning(f"⚠️ {diagnostic.filename}: {diagnostic.message}")
+        elif diagnostic.status == ERROR:
+            st.warning(f"❌ {diagnostic.filename}: {diagnostic.message}")
+
+
+def load_and_process_data(file_contents: list[tuple[str, str]],
+                          digests: list[str] | None = None) -> IngestResult:
+    """
+    Load and process multiple CSV files, reporting per-file results in the UI.
+    Files already seen (same name and bytes) are served from the ingest cache.
+    Digests are computed from the files if not given (e.g. by spool_uploads).
+    The result is not yet categorized (see get_categorized_dataset).
     """
-    normalized_dfs = []
-    load_errors = []
+    if digests is None:
+        with stage('hash', rows=len(file_contents)):
+            digests = [source_digest(filename, content) for filename, content in file_contents]
+    result = get_ingested_dataset(dataset_digest(digests), file_contents, digests)
+    show_diagnostics(result.diagnostics)
     
-    for filename, content in file_contents:
-        try:
-            file_io = io.BytesIO(content)
-            
-            # Try different encodings
-            df = None
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                try:
-                    file_io.seek(0)
-                    df = pd.read_csv(file_io, encoding=encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            
-            if df is None or df.empty:
-                load_errors.append(f"⚠️ {filename}: Could not read file or file is empty")
-                continue
-            
-            # Check if file has no headers (data in first row)
-            first_row = df.iloc[0] if len(df) > 0 else None
-            col_names = list(df.columns)
-            
-            # Heuristic: if column names look like dates or amounts, it's headerless
-            looks_headerless = False
-            for col in col_names[:3]:
-                col_str = str(col)
-                if '/' in col_str or col_str.replace('.', '').replace('-', '').isdigit():
-                    looks_headerless = True
-                    break
-            
-            if looks_headerless:
-                file_io.seek(0)
-                df = pd.read_csv(file_io, header=None, encoding=encoding)
-                # Assign generic column names
-                num_cols = len(df.columns)
-                if num_cols >= 3:
-                    df.columns = ['Transaction Date', 'Description', 'Amount'] + \
-                                [f'Col_{i}' for i in range(3, num_cols)]
-                elif num_cols == 2:
-                    df.columns = ['Transaction Date', 'Amount']
-                else:
-                    df.columns = [f'Col_{i}' for i in range(num_cols)]
-            
-            # NORMALIZE THIS FILE to target schema
-            normalized_df = normalize_single_file(df, filename)
-            
-            # Drop rows with invalid dates or zero amounts
-            valid_rows = normalized_df['date'].notna() & (normalized_df['amount'] != 0)
-            normalized_df = normalized_df[valid_rows]
-            
-            if len(normalized_df) > 0:
-                normalized_dfs.append(normalized_df)
-                st.success(f"✅ {filename}: Loaded {len(normalized_df)} transactions")
-            else:
-                load_errors.append(f"⚠️ {filename}: No valid transactions found")
-                
-        except Exception as e:
-            load_errors.append(f"❌ {filename}: {str(e)}")
-    
-    # Show any errors
-    for error in load_errors:
-        st.warning(error)
-    
-    if not normalized_dfs:
+    if result.data is None:
         st.error("❌ No valid data could be loaded from any file.")
-        return None
-    
-    # MERGE - All dataframes now have identical columns
-    combined = pd.concat(normalized_dfs, ignore_index=True)
-    
-    # Add derived columns for analysis
-    combined['year'] = combined['date'].dt.year
-    combined['month'] = combined['date'].dt.month
-    combined['month_name'] = combined['date'].dt.strftime('%B')
-    combined['is_income'] = combined['amount'] > 0
-    combined['abs_amount'] = combined['amount'].abs()
-    
-    return combined
+    return result
 
 
 # ============================================================================
 # VISUALIZATION
 # ============================================================================
 
-def create_monthly_expense_chart(data: pd.DataFrame, year: int):
+# Traces get numpy arrays of pre-aggregated values, which Plotly sends as compact
+# typed arrays; figures are cached per dataset, year and chart (get_chart_figure).
+
+def create_monthly_expense_chart(cube: pd.DataFrame, year: int) -> go.Figure | None:
     """Create stacked bar chart for monthly expenses by category."""
-    expense_data = data[(data['year'] == year) & (~data['is_income'])].copy()
-    
-    if expense_data.empty:
-        st.warning("No expense data available for the selected year.")
+    monthly = monthly_expenses(cube, year)
+    if monthly.empty:
         return None
     
-    monthly = expense_data.groupby(['month', 'month_name', 'processed_category'])['abs_amount'].sum().reset_index()
-    monthly = monthly.sort_values('month')
-    
-    fig = px.bar(
-        monthly, x='month_name', y='abs_amount', color='processed_category',
-        title='Monthly Expenses by Category',
-        labels={'month_name': 'Month', 'abs_amount': 'Amount ($)', 'processed_category': 'Category'},
-        height=500, color_discrete_sequence=px.colors.qualitative.Set3
+    colors = px.colors.qualitative.Set3
+    fig = go.Figure()
+    for i, (category, cells) in enumerate(monthly.groupby('processed_category', sort=True)):
+        fig.add_trace(go.Bar(
+            x=cells['month'].to_numpy(), y=cells['abs_amount'].to_numpy(), name=category,
+            marker_color=colors[i % len(colors)], hovertemplate='$%{y:,.2f}'
+        ))
+    fig.update_layout(
+        title='Monthly Expenses by Category', height=500, barmode='stack', hovermode='x unified',
+        legend_title_text='Category'
     )
-    fig.update_layout(barmode='stack', hovermode='x unified')
-    fig.update_yaxes(tickprefix='$', tickformat=',.0f')
+    fig.update_xaxes(title='Month', tickmode='array', tickvals=MONTH_NAMES.index.tolist(),
+                     ticktext=MONTH_NAMES.tolist())
+    fig.update_yaxes(title='Amount ($)', tickprefix='$', tickformat=',.0f')
     return fig
 
 
-def create_category_pie_chart(data: pd.DataFrame, year: int):
+def create_category_pie_chart(cube: pd.DataFrame, year: int) -> go.Figure | None:
     """Create pie chart for expense distribution."""
-    expense_data = data[(data['year'] == year) & (~data['is_income'])]
-    category_totals = expense_data.groupby('processed_category')['abs_amount'].sum().sort_values(ascending=False)
+    category_totals = category_expenses(cube, year)
     
     if category_totals.empty:
         return None
     
-    fig = px.pie(
-        values=category_totals.values, names=category_totals.index,
-        title='Expense Distribution by Category', hole=0.4,
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig = go.Figure(go.Pie(
+        labels=category_totals.index.tolist(), values=category_totals.to_numpy(), hole=0.4,
+        textposition='inside', textinfo='percent+label', sort=False
+    ))
+    fig.update_layout(title='Expense Distribution by Category', piecolorway=px.colors.qualitative.Set3)
+    return fig
+
+
+def create_spending_trend_chart(data: pd.DataFrame, year: int | None, freq: str,
+                                by_category: bool) -> go.Figure | None:
+    """
+    Spending per day or week for one year (or all years if None), as WebGL
+    lines downsampled to TREND_MAX_POINTS points in total.
+    """
+    if year is not None:
+        data = data[data['year'] == year]
+    trend = spending_trend(data, freq, by_category)
+    if trend.empty:
+        return None
+    
+    # Epoch milliseconds on a date axis: a numeric array instead of one string per point
+    x = trend.index.to_numpy().astype('datetime64[ms]').astype('int64')
+    max_points = max(2, TREND_MAX_POINTS // len(trend.columns))
+    fig = go.Figure()
+    for column in trend.columns:
+        xs, ys = downsample_minmax(x, trend[column].to_numpy(), max_points)
+        fig.add_trace(go.Scattergl(x=xs, y=ys, name=str(column), mode='lines', line_width=1,
+                                   hovertemplate='%{x|%b %d, %Y}: $%{y:,.2f}'))
+    fig.update_layout(title=f"{TREND_FREQUENCIES[freq]} Spending", height=400, hovermode='closest',
+                      showlegend=by_category, colorway=px.colors.qualitative.Set3 if by_category else None)
+    fig.update_xaxes(type='date')
+    fig.update_yaxes(tickprefix='$', tickformat=',.0f')
     return fig
 
 
+ROLLING_VIEWS = ["Trailing total", "Monthly average", "Cumulative"]
+
+
+def create_rolling_trend_chart(index: DateIndex, year: int | None, start, end, window: int,
+                               view: str) -> go.Figure | None:
+    """
+    Spending per category per month over start..end, from the date index's
+    prefix sums: trailing `window`-month totals or averages, or running totals.
+    """
+    if view == "Cumulative":
+        trend = index.cumulative(start, end)
+    else:
+        trend = index.rolling_monthly(start, end, window)
+        if view == "Monthly average":
+            trend = trend / window
+    trend = trend.loc[:, trend.any()]
+    if trend.empty:
+        return None
+    
+    # Largest categories first, so they lead the legend
+    trend = trend[trend.iloc[-1].sort_values(ascending=False).index]
+    x = trend.index.to_numpy().astype('datetime64[ms]').astype('int64')
+    fig = go.Figure()
+    for column in trend.columns:
+        fig.add_trace(go.Scatter(x=x, y=trend[column].to_numpy(), name=str(column), mode='lines+markers',
+                                 hovertemplate='%{x|%b %Y}: $%{y:,.2f}'))
+    title = "Cumulative Spending" if view == "Cumulative" else f"{view} ({window}-month window)"
+    fig.update_layout(title=title, height=450, hovermode='x unified', legend_title_text='Category',
+                      colorway=px.colors.qualitative.Set3)
+    fig.update_xaxes(type='date')
+    fig.update_yaxes(tickprefix='$', tickformat=',.0f')
+    return fig
+
+
+CHART_BUILDERS = {
+    'monthly': create_monthly_expense_chart,
+    'category': create_category_pie_chart,
+    'trend': create_spending_trend_chart,
+    'rolling': create_rolling_trend_chart,
+}
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def get_chart_figure(dataset_key: str, year: int | None, chart: str, _source: pd.DataFrame,
+                     options: tuple = ()) -> go.Figure | None:
+    """
+    Figure for one chart of a dataset: built once per (dataset, year, chart,
+    options) and shared read-only across reruns and sessions. `_source` is
+    the cube, the transactions for the trend chart, or the date index for
+    the rolling chart.
+    """
+    return CHART_BUILDERS[chart](_source, year, *options)
+
+
+# ============================================================================
+# DATE RANGE ANALYSIS
+# ============================================================================
+ROLLING_WINDOWS = [1, 3, 6, 12]
+
+
+def default_date_range(index: DateIndex) -> tuple:
+    """The trailing 12 months of data, or all of it if shorter."""
+    first, last = index.bounds()
+    return max(first, last - pd.DateOffset(years=1) + pd.Timedelta(days=1)).date(), last.date()
+
+
+def render_date_range_analysis(index: DateIndex, dataset_key: str) -> None:
+    """Totals, category breakdown and rolling trends for any date range, answered from the date index."""
+    first, last = index.bounds()
+    picked = st.date_input("Date range", value=default_date_range(index), min_value=first.date(),
+                           max_value=last.date(), key=f"range_dates_{dataset_key}")
+    if len(picked) < 2:
+        st.info("Select an end date to complete the range.")
+        return
+    start, end = picked
+    
+    totals = index.totals(start, end)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("💵 Income", f"${totals['income']:,.2f}")
+    col2.metric("💸 Expenses", f"${totals['spending']:,.2f}")
+    col3.metric("💰 Net", f"${totals['net']:,.2f}")
+    col4.metric("🧾 Transactions", f"{totals['transactions']:,}")
+    
+    col1, col2 = st.columns([2, 1])
+    view = col1.radio("View", ROLLING_VIEWS, horizontal=True, key='rolling_view')
+    window = col2.select_slider("Rolling window (months)", ROLLING_WINDOWS, value=3, key='rolling_window',
+                                disabled=view == "Cumulative")
+    fig = get_chart_figure(dataset_key, None, 'rolling', index, (start, end, window, view))
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No expenses in this date range.")
+    
+    with st.expander("Category totals for this range"):
+        st.dataframe(index.category_totals(start, end), use_container_width=True,
+                     column_config={col: st.column_config.NumberColumn(format="$%.2f")
+                                    for col in ('income', 'spending', 'net')})
+
+
+# ============================================================================
+# TRANSACTION EXPLORER
+# ============================================================================
+EXPLORER_PAGE_SIZES = [25, 50, 100, 250]
+
+
+def render_transaction_explorer(index: TransactionIndex, year: int) -> None:
+    """Searchable, filterable transaction table that sends only the current page to the browser."""
+    col1, col2, col3, col4 = st.columns([3, 1, 2, 2])
+    search = col1.text_input("Search description", key="explorer_search")
+    match = col2.selectbox("Match", ["contains", "starts with"], key="explorer_match")
+    categories = col3.multiselect("Category", index.facet_values('processed_category'),
+                                  key="explorer_categories")
+    sources = col4.multiselect("Source file", index.facet_values('source_file'), key="explorer_sources")
+    
+    positions = index.query(year, search, prefix=match == "starts with",
+                            categories=categories, sources=sources)
+    if len(positions) == 0:
+        st.info("No transactions match these filters.")
+        return
+    
+    col1, col2, _ = st.columns([1, 1, 4])
+    page_size = col1.selectbox("Rows per page", EXPLORER_PAGE_SIZES, index=1, key="explorer_page_size")
+    page_count = -(-len(positions) // page_size)
+    # Back to the first page whenever the filters change
+    filters = (year, search, match, tuple(categories), tuple(sources), page_size)
+    if st.session_state.get("explorer_filters") != filters:
+        st.session_state["explorer_filters"] = filters
+        st.session_state["explorer_page"] = 1
+    page_number = col2.number_input("Page", min_value=1, max_value=page_count, step=1, key="explorer_page")
+    
+    rows = index.page(positions, page_number, page_size)
+    st.dataframe(rows.assign(amount=amounts(rows))[EXPLORER_COLUMNS],
+                 hide_index=True, use_container_width=True)
+    start = (page_number - 1) * page_size
+    st.caption(f"Rows {start + 1:,}–{start + len(rows):,} of {len(positions):,} · page {page_number} of {page_count}")
+
+
+# ============================================================================
+# DIAGNOSTICS
+# ============================================================================
+
+def file_stage_table(diagnostics: list[FileDiagnostic]) -> pd.DataFrame:
+    """One row per file and ingest stage: statement format, seconds, rows and memory delta."""
+    rows = [
+        {'file': d.filename, 'status': d.status, 'format': d.format, **timing.__dict__}
+        for d in diagnostics for timing in d.stages
+    ]
+    return pd.DataFrame(rows, columns=['file', 'status', 'format', 'stage', 'seconds', 'rows', 'memory_delta_mb'])
+
+
+def render_diagnostics_panel(file_diagnostics: list[FileDiagnostic], recorder: StageRecorder) -> None:
+    """Optional sidebar panel with per-file ingest stages and this run's render timings."""
+    with st.sidebar:
+        st.markdown("---")
+        if not st.checkbox("🩺 Show diagnostics", value=False):
+            return
+        
+        page = pd.DataFrame(recorder.to_list())
+        if not page.empty:
+            st.caption(f"This run: {page['seconds'].sum():.3f}s")
+            st.dataframe(page, hide_index=True, use_container_width=True)
+        
+        files = file_stage_table(file_diagnostics)
+        if not files.empty:
+            st.caption("Per-file ingest stages (cached files keep their first-run timings)")
+            st.dataframe(files, hide_index=True, use_container_width=True)
+        
+        shared = get_shared_cache()
+        entries = pd.DataFrame(shared.entries())
+        if not entries.empty:
+            st.caption("Shared dataset cache (least recently used first); own_mb is what evicting an entry frees, "
+                       "since columns shared between entries are counted once")
+            st.dataframe(entries, hide_index=True, use_container_width=True)
+        
+        report = {
+            'run': recorder.to_list(),
+            'files': [d.to_dict() for d in file_diagnostics],
+            'caches': {'ingest': get_ingest_cache().stats(), 'shared': shared.stats()},
+        }
+        st.download_button("⬇️ Diagnostics JSON", json.dumps(report, indent=2),
+                           file_name="finance_app_diagnostics.json", mime="application/json")
+        
+        if PROFILE and os.path.exists(PROFILE_PATH):
+            with open(PROFILE_PATH, 'rb') as f:
+                st.download_button("⬇️ cProfile dump (previous run)", f.read(),
+                                   file_name="finance_app.pstats", mime="application/octet-stream")
+
+
+def run_profiled(func) -> None:
+    """Run func under cProfile and write pstats to PROFILE_PATH (atomically)."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another session's run is already being profiled (one profiler per process)
+        func()
+        return
+    try:
+        func()
+    finally:
+        profiler.disable()
+        tmp_path = f"{PROFILE_PATH}.{os.getpid()}.tmp"
+        profiler.dump_stats(tmp_path)
+        os.replace(tmp_path, PROFILE_PATH)
+
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
 def main():
+    # Pipeline stages and the render steps below are timed into one recorder per run
+    recorder = StageRecorder()
+    file_diagnostics = []
+    with recording(recorder):
+        render_dashboard(file_diagnostics)
+    render_diagnostics_panel(file_diagnostics, recorder)
+
+
+def render_dashboard(file_diagnostics: list[FileDiagnostic]):
     st.title("💰 Jia's Family Yearly Finance Summary")
     st.markdown("---")
     
@@ -437,7 +489,8 @@ def main():
         - **Handles multiple CSV formats automatically**
         """)
     
-    if not uploaded_files:
+    store = get_transaction_store()
+    if not uploaded_files and (store is None or not store.years()):
         st.info("👆 Please upload one or more CSV files to get started.")
         with st.expander("ℹ️ Supported CSV Formats"):
             st.markdown("""
@@ -455,53 +508,121 @@ def main():
             """)
         return
     
-    # Read file contents for caching
-    file_contents = []
-    for f in uploaded_files:
-        content = f.read()
-        file_contents.append((f.name, content))
-        f.seek(0)  # Reset for potential re-read
+    # Spooled once per upload; the pipeline reads the files by path and caches by digest
+    with stage('spool_uploads'):
+        spooled = spool_uploads(uploaded_files)
+    file_contents = [(f.name, f.path) for f in spooled]
+    digests = [f.digest for f in spooled]
     
     # Load and process data
-    with st.spinner("Processing files..."):
-        data = load_and_process_data(file_contents)
-    
-    if data is None:
-        return
+    rules = current_category_rules()
+    if store is not None:
+        # Persistent store: append new uploads, then read only the selected year
+        with st.spinner("Processing files..."), stage('store_ingest'):
+            file_diagnostics.extend(ingest_into_store(store, file_contents, digests,
+                                                      cache=get_ingest_cache(), executor=get_ingest_pool()))
+        show_diagnostics(file_diagnostics, verb="Stored")
+        years = store.years()
+        st.success(f"📊 **Total: {store.total_rows()} transactions stored from {store.file_count()} file(s)**")
+    else:
+        with st.spinner("Processing files..."):
+            result = load_and_process_data(file_contents, digests)
+        file_diagnostics.extend(result.diagnostics)
+        
+        if result.data is None:
+            return
+        
+        with stage('categorize', rows=len(result.data)):
+            data = get_categorized_dataset(result.dataset_key, rules.digest, result.data, rules)
+        dataset_key = dataset_digest([result.dataset_key, rules.digest])
+        with stage('aggregate', rows=len(data)):
+            cube = get_aggregate_cube(dataset_key, data)
+        years = cube_years(cube)
+        st.success(f"📊 **Total: {len(data)} transactions loaded from {len(uploaded_files)} file(s)**")
     
-    st.success(f"📊 **Total: {len(data)} transactions loaded from {len(uploaded_files)} file(s)**")
+    with st.sidebar:
+        cache_stats = get_ingest_cache().stats()
+        st.caption(
+            f"🗄️ Ingest cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses · "
+            f"{cache_stats['bytes'] / 1024**2:.1f} of {cache_stats['max_bytes'] / 1024**2:.0f} MB"
+        )
+        shared_stats = get_shared_cache().stats()
+        st.caption(
+            f"🤝 Shared datasets: {shared_stats['hit_rate']:.0%} hit rate · {shared_stats['entries']} entries · "
+            f"{shared_stats['bytes'] / 1024**2:.1f} of {shared_stats['max_bytes'] / 1024**2:.0f} MB"
+        )
+        st.caption(f"🏷️ Category rules: {rules.source} ({len(rules.patterns)} categories)")
     
     # Year filter
     with st.sidebar:
         st.markdown("---")
         st.header("🗓️ Filter by Year")
-        years = sorted(data['year'].dropna().unique().astype(int))
         if not years:
             st.error("No valid years found")
             return
         selected_year = st.selectbox("Select Year", years, index=len(years)-1)
     
+    if store is not None:
+        partition_files = store.partition_files(selected_year)
+        with stage('load_year'):
+            data = load_store_year(partition_files)
+        with stage('categorize', rows=len(data)):
+            data = get_categorized_dataset(dataset_digest(partition_files), rules.digest, data, rules)
+        dataset_key = dataset_digest(partition_files + [rules.digest])
+        with stage('aggregate', rows=len(data)):
+            cube = get_aggregate_cube(dataset_key, data)
+    
     # Calculate metrics
-    year_data = data[data['year'] == selected_year]
-    total_income = year_data[year_data['is_income']]['amount'].sum()
-    total_expenses = year_data[~year_data['is_income']]['abs_amount'].sum()
+    total_income, total_expenses = year_totals(cube, selected_year)
     net_savings = total_income - total_expenses
     
     # Display metrics
-    st.header(f"📈 {selected_year} Summary")
-    col1, col2, col3 = st.columns(3)
-    col1.metric("💵 Total Income", f"${total_income:,.2f}")
-    col2.metric("💸 Total Expenses", f"${total_expenses:,.2f}")
-    col3.metric("💰 Net Savings", f"${net_savings:,.2f}", 
-                delta_color="normal" if net_savings >= 0 else "inverse")
+    with stage('render_metrics'):
+        st.header(f"📈 {selected_year} Summary")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("💵 Total Income", f"${total_income:,.2f}")
+        col2.metric("💸 Total Expenses", f"${total_expenses:,.2f}")
+        col3.metric("💰 Net Savings", f"${net_savings:,.2f}", 
+                    delta_color="normal" if net_savings >= 0 else "inverse")
     
     st.markdown("---")
     
     # Monthly expense chart
     st.header("📊 Monthly Expense Breakdown")
-    fig = create_monthly_expense_chart(data, selected_year)
-    if fig:
-        st.plotly_chart(fig, use_container_width=True)
+    with stage('render_monthly_chart'):
+        fig = get_chart_figure(dataset_key, selected_year, 'monthly', cube)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("No expense data available for the selected year.")
+    
+    st.markdown("---")
+    
+    # Spending trend: WebGL lines, downsampled server-side
+    st.header("📉 Spending Trend")
+    col1, col2, col3 = st.columns(3)
+    freq = col1.radio("Granularity", list(TREND_FREQUENCIES), format_func=TREND_FREQUENCIES.get,
+                      horizontal=True, key='trend_freq')
+    all_years = store is None and col2.radio(
+        "Range", ["Selected year", "All years"], horizontal=True, key='trend_range'
+    ) == "All years"
+    by_category = col3.checkbox("Split by category", key='trend_by_category')
+    with stage('render_trend_chart'):
+        trend_fig = get_chart_figure(dataset_key, None if all_years else selected_year, 'trend', data,
+                                     (freq, by_category))
+        if trend_fig:
+            st.plotly_chart(trend_fig, use_container_width=True)
+            st.caption(f"Long ranges are downsampled to {TREND_MAX_POINTS:,} points in total, "
+                       "keeping the highest and lowest value of each interval.")
+    
+    st.markdown("---")
+    
+    # Arbitrary date ranges: binary searches and prefix sums over the date-sorted dataset
+    st.header("📆 Date Range Analysis")
+    with stage('render_date_range'):
+        with stage('date_index', rows=len(data)):
+            date_index = get_date_index(dataset_key, data)
+        render_date_range_analysis(date_index, dataset_key)
     
     st.markdown("---")
     
@@ -509,15 +630,14 @@ def main():
     st.header("🔍 Category Breakdown")
     col1, col2 = st.columns([2, 1])
     
-    with col1:
-        pie_fig = create_category_pie_chart(data, selected_year)
+    with col1, stage('render_category_chart'):
+        pie_fig = get_chart_figure(dataset_key, selected_year, 'category', cube)
         if pie_fig:
             st.plotly_chart(pie_fig, use_container_width=True)
     
-    with col2:
+    with col2, stage('render_top_categories'):
         st.subheader("Top Categories")
-        expense_data = data[(data['year'] == selected_year) & (~data['is_income'])]
-        category_totals = expense_data.groupby('processed_category')['abs_amount'].sum().sort_values(ascending=False)
+        category_totals = category_expenses(cube, selected_year)
         total = category_totals.sum()
         
         for i, (cat, amt) in enumerate(category_totals.head(10).items(), 1):
@@ -527,21 +647,19 @@ def main():
     
     # Source file breakdown
     st.markdown("---")
-    with st.expander("📂 Transactions by Source File"):
-        source_summary = data[data['year'] == selected_year].groupby('source_file').agg(
-            transactions=('amount', 'count'),
-            total_amount=('amount', 'sum')
-        ).reset_index()
+    with st.expander("📂 Transactions by Source File"), stage('render_source_summary'):
+        source_summary = source_file_summary(cube, selected_year)
         st.dataframe(source_summary, use_container_width=True)
     
-    # Raw data view
-    with st.expander("🔎 View Raw Transaction Data"):
-        display_cols = ['date', 'description', 'processed_category', 'amount', 'source_file']
-        st.dataframe(
-            year_data[display_cols].sort_values('date', ascending=False),
-            use_container_width=True, height=400
-        )
+    # Raw data view: paginated, so only the visible page is serialized
+    with st.expander("🔎 View Raw Transaction Data"), stage('render_raw_data'):
+        with stage('explorer_index', rows=len(data)):
+            index = get_transaction_index(dataset_key, data)
+        render_transaction_explorer(index, selected_year)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if PROFILE:
+        run_profiled(main)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: row-wise clean_amount vs. column-wise parse_amounts.
+
+Usage:
+    python benchmarks/bench_amount_parsing.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from finance_core import clean_amount, parse_amounts  # noqa: E402
+
+
+def make_amount_column(rows: int, seed: int = 0) -> pd.Series:
+    """Bank-style amount strings: plain, currency-formatted and accounting negatives."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 250, rows).round(2)
+    styles = rng.integers(0, 4, rows)
+    text = []
+    for value, style in zip(values, styles):
+        if style == 0:
+            text.append(f"{value:.2f}")
+        elif style == 1:
+            text.append(f"${value:,.2f}")
+        elif style == 2:
+            text.append(f"(${abs(value):,.2f})")
+        else:
+            text.append('N/A')
+    return pd.Series(text, dtype=object)
+
+
+def time_call(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    column = make_amount_column(args.rows)
+    numeric_column = pd.Series(np.random.default_rng(1).normal(0, 250, args.rows).round(2))
+
+    row_time, expected = time_call(lambda s: s.apply(clean_amount), column)
+    bulk_time, actual = time_call(parse_amounts, column)
+    numeric_time, _ = time_call(parse_amounts, numeric_column)
+
+    if not np.allclose(expected.to_numpy(), actual.to_numpy()):
+        raise SystemExit("parse_amounts disagrees with clean_amount")
+
+    print(f"rows:                         {args.rows:,}")
+    print(f"clean_amount via apply:       {row_time:8.3f}s")
+    print(f"parse_amounts (text column):  {bulk_time:8.3f}s  ({row_time / bulk_time:.1f}x)")
+    print(f"parse_amounts (numeric col):  {numeric_time:8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory report: legacy object-column layout vs. the compact transactions layout.
+
+Usage:
+    python benchmarks/bench_memory.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from finance_core import CATEGORY_DEFINITIONS, add_derived_columns, amount_total  # noqa: E402
+
+
+def make_normalized_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A normalized frame (TARGET_SCHEMA + processed_category) with realistic repetition."""
+    rng = np.random.default_rng(seed)
+    keywords = [k for info in CATEGORY_DEFINITIONS.values() for k in info['keywords']]
+    merchants = np.array([f"{k} #{n}" for k in keywords for n in range(3)], dtype=object)
+    categories = np.array(list(CATEGORY_DEFINITIONS) + ['Other', 'Income'], dtype=object)
+    files = np.array([f"statement_{i}.csv" for i in range(6)], dtype=object)
+    dates = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 6 * 365, rows), unit='D')
+    return pd.DataFrame({
+        'date': dates,
+        # Build new string objects per row, as read_csv would
+        'description': [str(m) + '' for m in rng.choice(merchants, rows)],
+        'amount': rng.normal(-40, 120, rows).round(2),
+        'category': [str(c) + '' for c in rng.choice(categories, rows)],
+        'source_file': [str(f) + '' for f in rng.choice(files, rows)],
+        'processed_category': [str(c) + '' for c in rng.choice(categories, rows)],
+    })
+
+
+def legacy_layout(df: pd.DataFrame) -> pd.DataFrame:
+    """Derived columns as load_and_process_data used to store them."""
+    df = df.copy()
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['month_name'] = df['date'].dt.strftime('%B')
+    df['is_income'] = df['amount'] > 0
+    df['abs_amount'] = df['amount'].abs()
+    return df
+
+
+def report(name: str, df: pd.DataFrame) -> int:
+    usage = df.memory_usage(deep=True, index=False)
+    print(f"\n{name}")
+    for col, nbytes in usage.items():
+        print(f"  {col:<20} {str(df[col].dtype)[:12]:<12} {nbytes / 1024**2:10.1f} MB")
+    total = int(usage.sum())
+    print(f"  {'TOTAL':<33} {total / 1024**2:10.1f} MB")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = make_normalized_frame(args.rows)
+    before = report("Legacy layout", legacy_layout(base))
+    after = report("Compact layout", add_derived_columns(base.copy()))
+    cents = add_derived_columns(base.copy(), amount_cents=True)
+    after_cents = report("Compact layout, integer cents", cents)
+
+    print(f"\nrows: {args.rows:,}  reduction: {before / after:.1f}x ({before / after_cents:.1f}x with cents)")
+    print(f"float total: {base['amount'].sum():,.2f}  cents total: {amount_total(cents):,.2f}")
+
+
+if __name__ == '__main__':
+    main()
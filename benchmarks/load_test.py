@@ -0,0 +1,231 @@
+"""
+Load test: concurrent dashboard sessions driven headlessly through Streamlit's AppTest.
+
+Each session uploads a synthetic statement set, then switches years and the
+trend granularity, timing every rerun. Sessions run in threads of one process
+and share its caches, like sessions of one `streamlit run` server.
+
+Usage:
+    python benchmarks/load_test.py --sessions 16 --concurrency 8 --rows 20000 -o load.json
+    python benchmarks/load_test.py --sessions 16 --compare load.json
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+# Keep learned statement formats in memory: runs start from the built-ins and don't touch the app's registry
+os.environ['FINANCE_APP_FORMATS_FILE'] = ''
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from streamlit.logger import set_log_level  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.util import patch_config_options  # noqa: E402
+
+from run_benchmarks import environment  # noqa: E402
+from synthetic import generate_statement_set  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(__file__), '..', 'app.py')
+ACTIONS = ['upload', 'switch_year', 'trend_granularity']
+PERCENTILES = [50, 95, 99]
+
+# Cache stats as the app reports them in the sidebar
+_INGEST_CAPTION = re.compile(r'Ingest cache: (\d+) hits / (\d+) misses')
+_SHARED_CAPTION = re.compile(r'Shared datasets: (\d+)% hit rate')
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (ingest worker processes are not included)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+
+def cache_stats(at: AppTest) -> dict:
+    """Process-wide cache stats from the sidebar captions of a session's last run."""
+    captions = ' '.join(caption.value for caption in at.sidebar.caption)
+    stats = {}
+    if match := _INGEST_CAPTION.search(captions):
+        hits, misses = int(match[1]), int(match[2])
+        stats['ingest'] = {'hits': hits, 'misses': misses,
+                           'hit_rate': hits / (hits + misses) if hits + misses else 0.0}
+    if match := _SHARED_CAPTION.search(captions):
+        stats['shared'] = {'hit_rate': int(match[1]) / 100}
+    return stats
+
+
+def timed_run(at: AppTest, action: str, timings: list) -> None:
+    """Rerun the app, recording (action, seconds); app exceptions are raised."""
+    start = time.perf_counter()
+    at.run()
+    timings.append((action, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{action}: {at.exception[0].message}")
+
+
+def shared_script_cache():
+    """
+    Make every AppTest run use one script cache, as a server's sessions do.
+    AppTest compiles the script afresh on each run, and concurrent compiles
+    of the same script can fail inside the parser on some CPython versions.
+    """
+    server_cache = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+    return mock.patch.object(ScriptCache, 'get_bytecode',
+                             lambda self, script_path: get_bytecode(server_cache, script_path))
+
+
+def run_session(files: list[tuple[str, bytes]], year_switches: int, timeout: float) -> dict:
+    """One user: upload the files, switch years, toggle the trend granularity."""
+    timings = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    try:
+        at.run()
+        at.sidebar.file_uploader[0].set_value([(name, content, 'text/csv') for name, content in files])
+        timed_run(at, 'upload', timings)
+
+        year = next(box for box in at.sidebar.selectbox if box.label == 'Select Year')
+        for i in range(year_switches):
+            year.select(year.options[i % len(year.options)])
+            timed_run(at, 'switch_year', timings)
+            year = next(box for box in at.sidebar.selectbox if box.label == 'Select Year')
+
+        at.radio(key='trend_freq').set_value('W')
+        timed_run(at, 'trend_granularity', timings)
+        return {'timings': timings, 'error': None, 'caches': cache_stats(at)}
+    except Exception as e:
+        return {'timings': timings, 'error': ''.join(traceback.format_exception_only(e)).strip(), 'caches': {}}
+
+
+def percentiles(seconds: list[float]) -> dict:
+    if not seconds:
+        return {f"p{p}": None for p in PERCENTILES}
+    values = np.percentile(seconds, PERCENTILES)
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, values)}
+
+
+def run_load_test(sessions: int, concurrency: int, rows: int, datasets: int,
+                  year_switches: int, timeout: float, seed: int = 0) -> dict:
+    """Run `sessions` sessions, `concurrency` at a time, over `datasets` distinct statement sets."""
+    statement_sets = [generate_statement_set(rows, seed=seed + i) for i in range(datasets)]
+    baseline_rss = peak_rss_mb()
+    finished = []
+    lock = threading.Lock()
+
+    def session(i):
+        result = run_session(statement_sets[i % datasets], year_switches, timeout)
+        with lock:
+            finished.append(result)
+            print(f"  session {len(finished):>3}/{sessions}: "
+                  f"{sum(s for _, s in result['timings']):6.2f}s"
+                  + (f"  ERROR {result['error']}" if result['error'] else ''), flush=True)
+
+    # AppTest toggles this option around every run; holding it keeps overlapping runs in test mode
+    with patch_config_options({'global.appTest': True}), shared_script_cache():
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(session, range(sessions)))
+        wall = time.perf_counter() - start
+
+    timings = [t for result in finished for t in result['timings']]
+    by_action = {action: [s for a, s in timings if a == action] for action in ACTIONS}
+    last_caches = next((r['caches'] for r in reversed(finished) if r['caches']), {})
+    return {
+        'sessions': sessions, 'concurrency': concurrency, 'rows': rows, 'datasets': datasets,
+        'year_switches': year_switches,
+        'reruns': len(timings),
+        'errors': [r['error'] for r in finished if r['error']],
+        'wall_seconds': wall,
+        'reruns_per_sec': len(timings) / wall if wall else None,
+        'sessions_per_min': 60 * sessions / wall if wall else None,
+        'latency': percentiles([s for _, s in timings]),
+        'latency_by_action': {action: percentiles(seconds) for action, seconds in by_action.items()},
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'caches': last_caches,
+    }
+
+
+def format_latency(stats: dict) -> str:
+    return '  '.join(f"{name} {value:7.3f}s" if value is not None else f"{name}       -"
+                     for name, value in stats.items())
+
+
+def report(result: dict) -> None:
+    print(f"\nsessions: {result['sessions']} ({result['concurrency']} concurrent), "
+          f"{result['datasets']} statement set(s) of {result['rows']:,} rows")
+    print(f"reruns:   {result['reruns']} in {result['wall_seconds']:.1f}s  "
+          f"({result['reruns_per_sec']:.2f} reruns/s, {result['sessions_per_min']:.1f} sessions/min)")
+    print(f"latency:  {format_latency(result['latency'])}")
+    for action, stats in result['latency_by_action'].items():
+        print(f"  {action:<18} {format_latency(stats)}")
+    print(f"peak RSS: {result['peak_rss_mb']:,.0f} MB (before sessions: {result['baseline_rss_mb']:,.0f} MB)")
+    caches = result['caches']
+    if 'ingest' in caches:
+        ingest = caches['ingest']
+        print(f"ingest cache: {ingest['hit_rate']:.0%} hit rate ({ingest['hits']} hits / {ingest['misses']} misses)")
+    if 'shared' in caches:
+        print(f"shared datasets: {caches['shared']['hit_rate']:.0%} hit rate")
+    if result['errors']:
+        print(f"errors: {len(result['errors'])} session(s) failed; first: {result['errors'][0]}")
+
+
+def compare(result: dict, baseline_path: str, threshold: float) -> bool:
+    """Print latency and throughput change against a previous run; True if either regressed."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['result']
+    print(f"\nvs {baseline_path} (regression threshold {threshold:.0%})")
+    changes = [(f"latency {name}", result['latency'][name] / old - 1)
+               for name, old in baseline['latency'].items() if old and result['latency'].get(name)]
+    # Lower throughput is the regression, so compare it inverted
+    changes.append(('reruns/s', baseline['reruns_per_sec'] / result['reruns_per_sec'] - 1))
+    regressed = False
+    for name, change in changes:
+        flag = ''
+        if change > threshold:
+            flag, regressed = '  REGRESSION', True
+        print(f"  {name:<15} {change:+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=0, help="sessions at a time (default: all)")
+    parser.add_argument('--rows', type=int, default=10_000, help="total rows per statement set")
+    parser.add_argument('--datasets', type=int, default=2,
+                        help="distinct statement sets; sessions beyond this re-upload one already seen")
+    parser.add_argument('--year-switches', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', help="previous results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown ratio counted as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    set_log_level('error')
+    result = run_load_test(args.sessions, args.concurrency or args.sessions, args.rows,
+                           max(1, args.datasets), args.year_switches, args.timeout, args.seed)
+    report(result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'result': result}, f, indent=2)
+        print(f"\nresults written to {args.output}")
+
+    regressed = bool(args.compare) and compare(result, args.compare, args.threshold)
+    if result['errors'] or regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark suite: rows/sec and peak memory per pipeline stage on synthetic statements.
+
+Stages: decode, date_parse, amount_parse, categorization, merge, aggregation.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10000 100000 1000000 -o results.json
+    python benchmarks/run_benchmarks.py --sizes 100000 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Keep learned statement formats in memory: runs start from the built-ins and don't touch the app's registry
+os.environ['FINANCE_APP_FORMATS_FILE'] = ''
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from finance_core import (  # noqa: E402
+    COLUMN_MAPPINGS, build_aggregate_cube, categorize_transactions, concat_transactions,
+    find_column, parse_amounts, parse_date_column, process_statement_file, read_statement_csv
+)
+from finance_core.pipeline import yearly_summary  # noqa: E402
+from synthetic import generate_statement_set  # noqa: E402
+
+STAGES = ['decode', 'date_parse', 'amount_parse', 'categorization', 'merge', 'aggregation']
+
+
+def prepare_stages(file_contents: list[tuple[str, bytes]]) -> dict:
+    """Build each stage as a zero-argument callable over precomputed inputs."""
+    raw_frames = [read_statement_csv(content) for _, content in file_contents]
+    columns = [(
+        df[find_column(df.columns, COLUMN_MAPPINGS['date'])],
+        [df[c] for key in ('amount', 'debit', 'credit')
+         if (c := find_column(df.columns, COLUMN_MAPPINGS[key])) is not None],
+    ) for df in raw_frames]
+    processed = [process_statement_file(name, content)[0] for name, content in file_contents]
+    merged = concat_transactions(processed)
+    combined = categorize_transactions(merged)
+
+    return {
+        'decode': lambda: [read_statement_csv(content) for _, content in file_contents],
+        'date_parse': lambda: [parse_date_column(dates) for dates, _ in columns],
+        'amount_parse': lambda: [parse_amounts(col) for _, amounts in columns for col in amounts],
+        'categorization': lambda: categorize_transactions(merged),
+        'merge': lambda: concat_transactions(processed),
+        'aggregation': lambda: yearly_summary(build_aggregate_cube(combined)),
+    }
+
+
+def measure(func, repeat: int, track_memory: bool) -> tuple[float, float | None]:
+    """Best wall time over `repeat` runs, and peak traced memory (MB) of one extra run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1024**2
+        tracemalloc.stop()
+    return best, peak_mb
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit, 'python': platform.python_version(), 'pandas': pd.__version__,
+        'platform': platform.platform(), 'cpus': os.cpu_count(),
+    }
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> bool:
+    """Print per-stage change against a previous run; True if any stage regressed."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    regressed = False
+    print(f"\nvs {baseline_path} (regression threshold {threshold:.0%})")
+    for result in results:
+        old = baseline.get((result['rows'], result['stage']))
+        if old is None:
+            continue
+        change = result['seconds'] / old['seconds'] - 1
+        flag = ''
+        if change > threshold:
+            flag, regressed = '  REGRESSION', True
+        print(f"  {result['rows']:>9,} {result['stage']:<15} {change:+7.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak-memory run")
+    parser.add_argument('-o', '--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', help="previous results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown ratio counted as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>9} {'stage':<15} {'seconds':>9} {'rows/sec':>12} {'peak MB':>9}")
+    for size in args.sizes:
+        stages = prepare_stages(generate_statement_set(size, seed=args.seed))
+        for stage in args.stages:
+            seconds, peak_mb = measure(stages[stage], args.repeat, not args.no_memory)
+            result = {'rows': size, 'stage': stage, 'seconds': seconds,
+                      'rows_per_sec': size / seconds if seconds else None, 'peak_mb': peak_mb}
+            results.append(result)
+            peak = f"{peak_mb:9.1f}" if peak_mb is not None else f"{'-':>9}"
+            print(f"{size:>9,} {stage:<15} {seconds:9.3f} {result['rows_per_sec']:12,.0f} {peak}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"\nresults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Seeded generator of synthetic bank statements in the layouts the app handles.
+
+Layouts:
+    chase         Transaction Date,Post Date,Description,Category,Type,Amount,Memo
+    debit_credit  Capital One style Debit/Credit columns, ISO dates
+    headerless    no header row: date, description, amount
+    latin1        latin-1 encoded, accented merchants, "$1,234.56" / "(12.00)" amounts
+    mixed_dates   Chase layout with a mix of date formats
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from finance_core import CATEGORY_DEFINITIONS  # noqa: E402
+
+LAYOUTS = ('chase', 'debit_credit', 'headerless', 'latin1', 'mixed_dates')
+
+# Descriptions that match no keyword, so the bank-category fallback is exercised too
+UNMATCHED_MERCHANTS = ['ACME CORP', 'ZELLE PAYMENT', 'VENMO', 'CHECK 1042', 'ATM WITHDRAWAL',
+                       'INTEREST CHARGE', 'ANNUAL FEE', 'CITY OF SPRINGFIELD', 'SQ *FARM STAND']
+ACCENTED_MERCHANTS = ['CAFÉ CRÈME', 'CRÊPERIE SAINT-GERMAIN', 'BOULANGERIE ÉCLAIR', 'MÜLLER MARKT']
+INCOME_DESCRIPTIONS = ['PAYROLL DEPOSIT ACME INC', 'DIRECT DEP EMPLOYER', 'TAX REFUND', 'INTEREST PAYMENT']
+BANK_CATEGORIES = ['Shopping', 'Food & Drink', 'Groceries', 'Travel', 'Bills & Utilities',
+                   'Entertainment', 'Gas', 'Health & Wellness', 'Personal', '']
+CITIES = ['NEW YORK NY', 'SEATTLE WA', 'AUSTIN TX', 'SAN JOSE CA', 'CHICAGO IL']
+
+
+def merchant_pool(rng: np.random.Generator, size: int = 400) -> np.ndarray:
+    """Realistic merchant strings built around CATEGORY_DEFINITIONS keywords."""
+    keywords = [k for info in CATEGORY_DEFINITIONS.values() for k in info['keywords']]
+    names = []
+    for i in range(size):
+        keyword = keywords[rng.integers(len(keywords))]
+        style = i % 4
+        if style == 0:
+            names.append(f"{keyword} #{rng.integers(100, 9999)}")
+        elif style == 1:
+            names.append(f"SQ *{keyword} {CITIES[rng.integers(len(CITIES))]}")
+        elif style == 2:
+            names.append(f"{keyword}.COM*{rng.integers(10**5, 10**6)}")
+        else:
+            names.append(f"TST* {keyword}")
+    return np.array(names + UNMATCHED_MERCHANTS, dtype=object)
+
+
+def _transactions(rows: int, rng: np.random.Generator, start: str, days: int,
+                  merchants: np.ndarray) -> pd.DataFrame:
+    """Dates, descriptions, bank categories and signed amounts (income positive)."""
+    income = rng.random(rows) < 0.04
+    descriptions = rng.choice(merchants, rows)
+    descriptions[income] = rng.choice(INCOME_DESCRIPTIONS, int(income.sum()))
+    amounts = -np.round(rng.lognormal(3.3, 1.0, rows), 2)
+    amounts[income] = np.round(rng.uniform(500, 6000, int(income.sum())), 2)
+    amounts[amounts == 0] = -0.01
+    return pd.DataFrame({
+        'date': pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit='D'),
+        'description': descriptions,
+        'category': rng.choice(BANK_CATEGORIES, rows),
+        'amount': amounts,
+    }).sort_values('date', ignore_index=True)
+
+
+def generate_statement(rows: int, layout: str = 'chase', seed: int = 0,
+                       start: str = '2021-01-01', years: int = 3) -> bytes:
+    """One statement CSV with `rows` transactions, as the raw bytes a bank would export."""
+    rng = np.random.default_rng(seed)
+    merchants = merchant_pool(rng)
+    if layout == 'latin1':
+        merchants = np.concatenate([merchants, np.array(ACCENTED_MERCHANTS, dtype=object)])
+    txns = _transactions(rows, rng, start, 365 * years, merchants)
+
+    if layout in ('chase', 'mixed_dates'):
+        dates = txns['date'].dt.strftime('%m/%d/%Y')
+        if layout == 'mixed_dates':
+            iso = rng.random(rows) < 0.1
+            short = rng.random(rows) < 0.05
+            dates = dates.mask(iso, txns['date'].dt.strftime('%Y-%m-%d'))
+            dates = dates.mask(short & ~iso, txns['date'].dt.strftime('%m/%d/%y'))
+        out = pd.DataFrame({
+            'Transaction Date': dates,
+            'Post Date': (txns['date'] + pd.Timedelta(days=1)).dt.strftime('%m/%d/%Y'),
+            'Description': txns['description'],
+            'Category': txns['category'],
+            'Type': np.where(txns['amount'] > 0, 'Payment', 'Sale'),
+            'Amount': txns['amount'].map('{:.2f}'.format),
+            'Memo': '',
+        })
+        return out.to_csv(index=False).encode('utf-8')
+
+    if layout == 'debit_credit':
+        out = pd.DataFrame({
+            'Transaction Date': txns['date'].dt.strftime('%Y-%m-%d'),
+            'Posted Date': (txns['date'] + pd.Timedelta(days=1)).dt.strftime('%Y-%m-%d'),
+            'Card No.': 1234,
+            'Description': txns['description'],
+            'Category': txns['category'],
+            'Debit': np.where(txns['amount'] < 0, (-txns['amount']).map('{:.2f}'.format), ''),
+            'Credit': np.where(txns['amount'] > 0, txns['amount'].map('{:.2f}'.format), ''),
+        })
+        return out.to_csv(index=False).encode('utf-8')
+
+    if layout == 'headerless':
+        out = pd.DataFrame({
+            'date': txns['date'].dt.strftime('%m/%d/%Y'),
+            'description': txns['description'],
+            'amount': txns['amount'].map('{:.2f}'.format),
+        })
+        return out.to_csv(index=False, header=False).encode('utf-8')
+
+    if layout == 'latin1':
+        formatted = txns['amount'].abs().map('${:,.2f}'.format)
+        accounting = rng.random(rows) < 0.5
+        amounts = np.where(txns['amount'] < 0,
+                           np.where(accounting, '(' + formatted + ')', '-' + formatted),
+                           formatted)
+        out = pd.DataFrame({
+            'Date': txns['date'].dt.strftime('%m/%d/%Y'),
+            'Description': txns['description'],
+            'Amount': amounts,
+        })
+        return out.to_csv(index=False).encode('latin-1')
+
+    raise ValueError(f"unknown layout: {layout!r}")
+
+
+def generate_statement_set(total_rows: int, seed: int = 0,
+                           layouts: tuple[str, ...] = LAYOUTS) -> list[tuple[str, bytes]]:
+    """One file per layout, splitting total_rows between them: [(filename, content), ...]."""
+    per_file = max(1, total_rows // len(layouts))
+    return [
+        (f"synthetic_{layout}_{seed}.csv", generate_statement(per_file, layout, seed=seed + i))
+        for i, layout in enumerate(layouts)
+    ]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic statement set to a directory.")
+    parser.add_argument('output_dir')
+    parser.add_argument('--rows', type=int, default=10_000, help="total rows across all files")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for filename, content in generate_statement_set(args.rows, args.seed):
+        with open(os.path.join(args.output_dir, filename), 'wb') as f:
+            f.write(content)
+        print(f"{filename}: {len(content) / 1024:.0f} KB")
@@ -0,0 +1,35 @@
+"""
+Core statement-processing pipeline, importable without Streamlit or Plotly.
+Each file is read and normalized to TARGET_SCHEMA independently; the merged
+transactions are then categorized as a separate stage.
+Run `python -m finance_core --help` for the headless batch CLI.
+"""
+from finance_core.categorize import (
+    CATEGORY_DEFINITIONS, ORIGINAL_CATEGORY_MAPPING, DEFAULT_CATEGORY_RULES,
+    CategoryRules, build_category_rules, load_category_rules, compile_category_rules,
+    categorize_transaction, categorize_transactions, map_original_category
+)
+from finance_core.cache import IngestCache, SharedDatasetCache, dataset_digest, file_digest, freeze_frame
+from finance_core.compat import HAS_PYARROW
+from finance_core.cube import CUBE_DIMENSIONS, build_aggregate_cube
+from finance_core.dateindex import DateIndex, sort_by_date
+from finance_core.dedup import drop_duplicate_transactions, find_duplicates, transaction_keys
+from finance_core.diagnostics import FileDiagnostic, StageRecorder, StageTiming, recording, stage
+from finance_core.explorer import EXPLORER_COLUMNS, TransactionIndex
+from finance_core.formats import BUILTIN_FORMATS, FormatRegistry, StatementFormat, get_format_registry
+from finance_core.normalize import (
+    TARGET_SCHEMA, COLUMN_MAPPINGS, DATE_FORMATS,
+    find_column, clean_amount, parse_amounts, detect_date_format, parse_date_column,
+    normalize_single_file, resolve_statement_format
+)
+from finance_core.parallel import create_ingest_pool, process_files, resolve_worker_count
+from finance_core.pipeline import IngestResult, ingest_files, ingest_into_store, summarize
+from finance_core.reader import (
+    StatementLayout, read_statement_csv, iter_statement_chunks, sniff_statement_layout, process_statement_file
+)
+from finance_core.spool import SpooledFile, UploadSpool, mapped_file, source_digest, spool_file
+from finance_core.transactions import (
+    CATEGORICAL_COLUMNS, add_derived_columns, concat_transactions,
+    amounts, abs_amounts, amount_total, month_names
+)
+from finance_core.trends import TREND_FREQUENCIES, downsample_minmax, period_starts, spending_trend
@@ -0,0 +1,3 @@
+from finance_core.cli import main
+
+raise SystemExit(main())
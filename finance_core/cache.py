@@ -0,0 +1,327 @@
+"""
+Process-wide caches, each LRU within a memory budget: the per-file ingest
+cache (normalized frames keyed by content hash) and the shared dataset cache
+(merged datasets and their aggregates, keyed by dataset digest).
+"""
+import dataclasses
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from finance_core.diagnostics import FileDiagnostic
+
+INGEST_CACHE_MAX_BYTES = int(os.environ.get('FINANCE_APP_INGEST_CACHE_MB', '512')) * 1024 * 1024
+SHARED_CACHE_MAX_BYTES = int(os.environ.get('FINANCE_APP_SHARED_CACHE_MB', '1024')) * 1024 * 1024
+
+
+def file_digest(filename: str, content: bytes) -> str:
+    """Content hash for one uploaded file (the name is part of it via source_file)."""
+    hasher = hashlib.sha256(content)
+    hasher.update(filename.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def dataset_digest(digests: list[str]) -> str:
+    """Key identifying a combined dataset by the digests of its files."""
+    return hashlib.sha256('\n'.join(digests).encode('utf-8')).hexdigest()
+
+
+class IngestCache:
+    """Thread-safe LRU cache of per-file ingest results, bounded by a memory budget."""
+    
+    def __init__(self, max_bytes: int = INGEST_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # digest -> (frame, diagnostic, nbytes)
+        self._lock = threading.Lock()
+    
+    def get(self, digest: str) -> tuple[pd.DataFrame | None, FileDiagnostic] | None:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0], entry[1]
+    
+    def put(self, digest: str, frame: pd.DataFrame | None, diagnostic: FileDiagnostic) -> None:
+        nbytes = int(frame.memory_usage(deep=True).sum()) if frame is not None else 0
+        if nbytes > self.max_bytes:
+            return  # Larger than the whole budget: don't evict everything for it
+        with self._lock:
+            if digest in self._entries:
+                self.current_bytes -= self._entries.pop(digest)[2]
+            self._entries[digest] = (frame, diagnostic, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'bytes': self.current_bytes, 'max_bytes': self.max_bytes
+            }
+
+
+def _root_array(values: np.ndarray) -> np.ndarray:
+    """The array that owns a view's memory (a frame's column arrays are views of its blocks)."""
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+def _address(values: np.ndarray) -> int:
+    return values.__array_interface__['data'][0]
+
+
+def frame_buffers(df: pd.DataFrame) -> dict[tuple, int]:
+    """
+    Memory behind a frame, keyed by the buffer that holds it: frames sharing
+    columns (shallow copies, categorize_transactions output) share keys.
+    """
+    buffers = {('index', id(df.index)): int(df.index.memory_usage(deep=True))}
+    for _, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            root = _root_array(series.cat.codes.to_numpy())
+            buffers[('array', _address(root), root.nbytes)] = root.nbytes
+            categories = series.cat.categories
+            buffers[('categories', id(categories))] = int(categories.memory_usage(deep=True))
+        elif isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+            root = _root_array(values)
+            buffers[('array', _address(root), root.nbytes)] = root.nbytes
+            if values.dtype == object:
+                # The Python objects the column points to, beyond its pointer array. Summed
+                # directly: pandas' deep memory_usage fails on read-only (frozen) object arrays.
+                buffers[('objects', _address(values))] = sum(map(sys.getsizeof, values))
+        else:
+            buffers[('extension', id(series.array))] = int(series.memory_usage(deep=True, index=False))
+    return buffers
+
+
+def value_buffers(value) -> dict[tuple, int]:
+    """
+    Memory a cached value keeps alive, keyed by buffer: its frames (including
+    the frame an index holds as `data`) plus, for indexes, their own `nbytes`.
+    """
+    if isinstance(value, pd.DataFrame):
+        return frame_buffers(value)
+    if isinstance(value, pd.Series):
+        return frame_buffers(value.to_frame())
+    if dataclasses.is_dataclass(value):
+        buffers = {}
+        for field in dataclasses.fields(value):
+            if isinstance(getattr(value, field.name), pd.DataFrame):
+                buffers.update(frame_buffers(getattr(value, field.name)))
+        return buffers
+    buffers = {('own', id(value)): int(getattr(value, 'nbytes', 0))}
+    if isinstance(getattr(value, 'data', None), pd.DataFrame):
+        buffers.update(frame_buffers(value.data))
+    return buffers
+
+
+def freeze_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make the arrays behind a frame's NumPy-backed columns read-only, in place,
+    and return a shallow copy to use from then on: column views pandas
+    already handed out or cached stay writable, the copy's views are not.
+    """
+    for _, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.codes.to_numpy()
+        elif isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+        else:
+            continue  # extension arrays: to_numpy() would be a copy
+        # Column arrays are views of the frame's blocks; lock the array that owns the memory
+        _root_array(values).flags.writeable = False
+    return df.copy(deep=False)
+
+
+def _frame_fields(value) -> list[str]:
+    return [field.name for field in dataclasses.fields(value)
+            if isinstance(getattr(value, field.name), pd.DataFrame)]
+
+
+def _freeze_arrays(value) -> None:
+    """Mark the NumPy arrays in an object's attributes (and their tuples and dicts) read-only."""
+    pending = list(vars(value).values())
+    while pending:
+        item = pending.pop()
+        if isinstance(item, np.ndarray):
+            item.flags.writeable = False
+        elif isinstance(item, (tuple, list)):
+            pending.extend(item)
+        elif isinstance(item, dict):
+            pending.extend(item.values())
+
+
+def freeze(value):
+    """
+    Frozen form of a value to share: a DataFrame or the DataFrame fields of a
+    dataclass such as IngestResult via freeze_frame; other objects (indexes)
+    get their arrays and their `data` frame frozen in place.
+    """
+    if isinstance(value, pd.DataFrame):
+        return freeze_frame(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.replace(value, **{name: freeze_frame(getattr(value, name))
+                                             for name in _frame_fields(value)})
+    if hasattr(value, '__dict__'):
+        _freeze_arrays(value)
+        if isinstance(getattr(value, 'data', None), pd.DataFrame):
+            value.data = freeze_frame(value.data)
+    return value
+
+
+@dataclasses.dataclass
+class SharedEntry:
+    value: object
+    buffers: dict[tuple, int]
+    created: float
+    hits: int = 0
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(self.buffers.values())
+
+
+class SharedDatasetCache:
+    """
+    Immutable datasets and aggregates shared by every session in the process.
+    
+    Each (kind, key) is built once; concurrent requests for it wait for that
+    build instead of repeating it. Frames, including those inside a dataclass
+    like IngestResult, are frozen read-only and handed out as shallow copies,
+    so a session can add columns to its view but cannot change the shared
+    arrays; indexes are shared as is, with their arrays read-only. Entries are evicted least recently used first
+    to stay within max_bytes.
+    
+    Memory is counted per buffer: a derived dataset sharing columns with
+    another entry is charged only for its new columns, and an index is
+    charged for the frame it holds until no entry holds that frame.
+    """
+    
+    def __init__(self, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # (kind, key) -> SharedEntry
+        self._buffers = {}  # buffer key -> [nbytes, entries holding it]
+        self._building = {}  # (kind, key) -> lock held while it is built
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _view(value):
+        """What a caller gets: frames (also inside dataclasses) as shallow copies, indexes as is."""
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        if dataclasses.is_dataclass(value):
+            return dataclasses.replace(value, **{name: getattr(value, name).copy(deep=False)
+                                                 for name in _frame_fields(value)})
+        return value
+    
+    def _lookup(self, cache_key: tuple[str, str]):
+        """The entry's value (counting a hit), or None; call with the lock held."""
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(cache_key)
+        entry.hits += 1
+        self.hits += 1
+        return entry.value
+    
+    def get_or_build(self, kind: str, key: str, build):
+        """The cached value for (kind, key), calling build() only if it is not cached."""
+        cache_key = (kind, key)
+        with self._lock:
+            value = self._lookup(cache_key)
+            if value is not None:
+                return self._view(value)
+            build_lock = self._building.setdefault(cache_key, threading.Lock())
+        
+        with build_lock:
+            with self._lock:
+                value = self._lookup(cache_key)  # built while we waited
+                if value is None:
+                    self.misses += 1
+            if value is not None:
+                return self._view(value)
+            try:
+                value = freeze(build())
+                self.put(kind, key, value)
+            finally:
+                with self._lock:
+                    self._building.pop(cache_key, None)
+        return self._view(value)
+    
+    def _release(self, entry: SharedEntry) -> None:
+        """Drop an entry's claim on its buffers; call with the lock held."""
+        for buffer in entry.buffers:
+            held = self._buffers[buffer]
+            held[1] -= 1
+            if held[1] == 0:
+                del self._buffers[buffer]
+                self.current_bytes -= held[0]
+    
+    def put(self, kind: str, key: str, value) -> None:
+        buffers = value_buffers(value)
+        with self._lock:
+            cache_key = (kind, key)
+            if cache_key in self._entries:
+                self._release(self._entries.pop(cache_key))
+            new_bytes = sum(n for buffer, n in buffers.items() if buffer not in self._buffers)
+            if new_bytes > self.max_bytes:
+                return  # Larger than the whole budget: don't evict everything for it
+            self._entries[cache_key] = SharedEntry(value, buffers, time.time())
+            for buffer, nbytes in buffers.items():
+                held = self._buffers.setdefault(buffer, [nbytes, 0])
+                if held[1] == 0:
+                    self.current_bytes += nbytes
+                held[1] += 1
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+    
+    def _own_bytes(self, entry: SharedEntry) -> int:
+        """Bytes only this entry holds, i.e. what evicting it frees; call with the lock held."""
+        return sum(n for buffer, n in entry.buffers.items() if self._buffers[buffer][1] == 1)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            kinds = {}
+            for (kind, _), entry in self._entries.items():
+                totals = kinds.setdefault(kind, {'entries': 0, 'bytes': 0})
+                totals['entries'] += 1
+                totals['bytes'] += self._own_bytes(entry)
+            return {
+                'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0, 'evictions': self.evictions,
+                'bytes': self.current_bytes, 'max_bytes': self.max_bytes, 'kinds': kinds
+            }
+    
+    def entries(self) -> list[dict]:
+        """One row per cached value, least recently used first."""
+        now = time.time()
+        with self._lock:
+            return [
+                {'kind': kind, 'key': key[:12], 'mb': entry.nbytes / 1024**2,
+                 'own_mb': self._own_bytes(entry) / 1024**2,
+                 'hits': entry.hits, 'age_s': round(now - entry.created, 1)}
+                for (kind, key), entry in self._entries.items()
+            ]
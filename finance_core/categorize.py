@@ -0,0 +1,267 @@
+"""
+Transaction categorization: keyword rules and bank-category mapping.
+
+Categorization runs as its own stage on the combined transactions, after
+ingest, so editing the rules re-evaluates only the unique descriptions and
+never re-reads a statement. Rules can be loaded from a JSON or YAML file.
+"""
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from finance_core.compat import yaml
+
+# ============================================================================
+# CATEGORIZATION LOGIC
+# ============================================================================
+CATEGORY_DEFINITIONS = {
+    'Utilities': {
+        'keywords': ['ELECTRIC', 'WATER', 'GAS', 'INTERNET', 'PHONE', 'CELLULAR', 'MOBILE',
+            'SHELL', 'CHEVRON', 'EXXON', 'BP', 'ARCO', 'VALERO', 'GAS STATION',
+            'POWER', 'UTILITY', 'PG&E', 'EDISON', 'CON EDISON', 'DUKE ENERGY',
+            'AT&T', 'VERIZON', 'T-MOBILE', 'SPRINT', 'COMCAST', 'XFINITY',
+            'SPECTRUM', 'COX', 'OPTIMUM', 'CABLE', 'INTERNET SERVICE'],
+        'description': 'Monthly utilities: electricity, water, gas, internet, phone, cable'
+    },
+    'Entertainment': {
+        'keywords': ['NETFLIX', 'SPOTIFY', 'DISNEY', 'HULU', 'AMAZON PRIME', 'APPLE TV',
+            'YOUTUBE PREMIUM', 'PARAMOUNT', 'HBO', 'MAX', 'PEACOCK', 'SHOWTIME',
+            'CINEMA', 'MOVIE', 'THEATER', 'AMC', 'REGAL', 'CINEMARK',
+            'CONCERT', 'TICKETMASTER', 'STUBHUB', 'EVENTBRITE',
+            'GAME', 'STEAM', 'PLAYSTATION', 'XBOX', 'NINTENDO',
+            'MUSIC', 'APPLE MUSIC', 'PANDORA', 'AUDIBLE', 'BOOKS'],
+        'description': 'Streaming, movies, concerts, games, entertainment subscriptions'
+    },
+    'Travel': {
+        'keywords': ['HOTEL', 'MOTEL', 'AIRBNB', 'VRBO', 'RESORT', 'LODGING',
+            'AIRLINE', 'DELTA', 'UNITED', 'AMERICAN AIRLINES', 'SOUTHWEST',
+            'JETBLUE', 'ALASKA AIR', 'FRONTIER', 'SPIRIT',
+            'UBER', 'LYFT', 'TAXI', 'RIDESHARE', 'TRANSPORTATION',
+            'BOOKING', 'EXPEDIA', 'TRIVAGO', 'KAYAK', 'PRICELINE',
+            'RENTAL CAR', 'HERTZ', 'ENTERPRISE', 'AVIS', 'BUDGET',
+            'TRAVEL', 'VACATION', 'TRIP', 'FLIGHT', 'AIRPORT'],
+        'description': 'Hotels, flights, car rentals, rideshares, travel expenses'
+    },
+    'Clothes & Shoes': {
+        'keywords': ['ZARA', 'NIKE', 'UNIQLO', 'MACY', "MACY'S", 'H&M', 'ADIDAS',
+            'OLD NAVY', 'GAP', 'NORDSTROM', 'BLOOMINGDALE', 'SAKS',
+            'FOOT LOCKER', 'FINISH LINE', 'DSW', 'SHOE',
+            'CLOTHING', 'APPAREL', 'FASHION', 'OUTFIT',
+            'BANANA REPUBLIC', 'J.CREW', 'ABERCROMBIE', 'HOLLISTER',
+            'LULULEMON', 'ATHLETA', 'UNDER ARMOUR', 'PUMA', 'REEBOK'],
+        'description': 'Clothing, shoes, accessories, fashion purchases'
+    },
+    'Groceries': {
+        'keywords': ['WHOLE FOODS', 'TRADER JOE', "TRADER JOE'S", 'COSTCO', 'KROGER',
+            'SAFEWAY', 'ALBERTSONS', 'VONS', 'RALPHS', 'FOOD LION',
+            'PUBLIX', 'WEGMANS', 'H-E-B', 'WINN-DIXIE', 'GIANT',
+            'STOP & SHOP', 'SHOPRITE', 'MEIJER', 'HY-VEE',
+            'GROCERY', 'SUPERMARKET', 'MARKET', 'FOOD STORE',
+            'SPROUTS', 'FRESH MARKET', 'WHOLE FOODS MARKET', 'ALDI', 'LIDL'],
+        'description': 'Grocery shopping, food purchases, household essentials'
+    },
+    'Dining': {
+        'keywords': ['RESTAURANT', 'CAFE', 'COFFEE', 'STARBUCKS', 'DUNKIN',
+            'MCDONALD', 'BURGER KING', 'WENDY', 'TACO BELL',
+            'CHIPOTLE', 'PANERA', 'SUBWAY', 'DOMINO', 'PIZZA',
+            'DINING', 'EAT', 'FOOD', 'LUNCH', 'DINNER', 'BREAKFAST',
+            'GRUBHUB', 'DOORDASH', 'UBER EATS', 'POSTMATES',
+            'BAKERY', 'DELI', 'FAST FOOD'],
+        'description': 'Restaurant meals, coffee shops, fast food, food delivery'
+    },
+    'Healthcare': {
+        'keywords': ['PHARMACY', 'CVS', 'WALGREENS', 'RITE AID',
+            'DOCTOR', 'HOSPITAL', 'MEDICAL', 'HEALTH', 'CLINIC',
+            'DENTIST', 'DENTAL', 'VISION', 'OPTICAL', 'EYE',
+            'INSURANCE', 'HEALTH INSURANCE', 'MEDICAL BILL',
+            'PRESCRIPTION', 'MEDICATION', 'DRUG STORE'],
+        'description': 'Medical expenses, prescriptions, doctor visits, dental, vision'
+    },
+    'Home & Garden': {
+        'keywords': ['HOME DEPOT', 'LOWE', "LOWE'S", 'HARDWARE', 'HOME IMPROVEMENT',
+            'IKEA', 'WAYFAIR', 'OVERSTOCK', 'BED BATH',
+            'FURNITURE', 'DECOR', 'GARDEN', 'LANDSCAPING', 'LAWN',
+            'PAINT', 'TOOL', 'APPLIANCE'],
+        'description': 'Home improvement, furniture, appliances, gardening'
+    },
+    'Shopping': {
+        'keywords': ['AMAZON', 'EBAY', 'ETSY', 'ONLINE', 'SHOPPING',
+            'TARGET', 'WALMART', 'DEPARTMENT STORE', 'RETAIL', 'STORE'],
+        'description': 'General shopping and retail purchases'
+    },
+    'Transportation': {
+        'keywords': ['METRO', 'SUBWAY', 'BUS', 'TRANSIT', 'PUBLIC TRANSPORT',
+            'PARKING', 'TOLL', 'EZPASS', 'FASTRAK',
+            'CAR WASH', 'AUTO REPAIR', 'MECHANIC', 'OIL CHANGE',
+            'TIRE', 'AUTO PARTS', 'NAPA', 'AUTOZONE'],
+        'description': 'Public transit, parking, tolls, car maintenance'
+    }
+}
+
+# Maps bank-supplied category labels onto our categories (used when no keyword matches)
+ORIGINAL_CATEGORY_MAPPING = {
+    'BILLS & UTILITIES': 'Utilities', 'UTILITIES': 'Utilities',
+    'GROCERIES': 'Groceries', 'GROCERY': 'Groceries',
+    'GAS': 'Utilities', 'GAS & FUEL': 'Utilities',
+    'ENTERTAINMENT': 'Entertainment', 'TRAVEL': 'Travel',
+    'SHOPPING': 'Shopping', 'DINING': 'Dining',
+    'FOOD & DINING': 'Dining', 'HEALTHCARE': 'Healthcare',
+    'MEDICAL': 'Healthcare', 'HOME & GARDEN': 'Home & Garden',
+    'TRANSPORTATION': 'Transportation', 'AUTO & TRANSPORT': 'Transportation'
+}
+
+
+def compile_category_rules(definitions: dict) -> list[tuple[str, re.Pattern]]:
+    """
+    Compile category keywords into one alternation pattern per category.
+    Categories keep their definition order, so the first category with any
+    matching keyword still wins.
+    """
+    rules = []
+    for category, info in definitions.items():
+        keywords = sorted(set(info['keywords']), key=len, reverse=True)
+        if keywords:
+            rules.append((category, re.compile('|'.join(re.escape(k) for k in keywords))))
+    return rules
+
+
+@dataclass(frozen=True)
+class CategoryRules:
+    """Keyword definitions and bank-category mapping, compiled once; `digest` identifies the rule set."""
+    definitions: dict
+    bank_categories: dict
+    patterns: tuple[tuple[str, re.Pattern], ...]
+    digest: str
+    source: str = 'built-in'
+
+
+def build_category_rules(definitions: dict, bank_categories: dict = ORIGINAL_CATEGORY_MAPPING,
+                         source: str = 'built-in') -> CategoryRules:
+    """Compile a rule set; keys of bank_categories are matched upper-cased."""
+    bank_categories = {str(k).upper().strip(): v for k, v in bank_categories.items()}
+    canonical = json.dumps([list(definitions.items()), sorted(bank_categories.items())],
+                           sort_keys=True, default=str)
+    return CategoryRules(
+        definitions, bank_categories, tuple(compile_category_rules(definitions)),
+        hashlib.sha256(canonical.encode('utf-8')).hexdigest(), source
+    )
+
+
+DEFAULT_CATEGORY_RULES = build_category_rules(CATEGORY_DEFINITIONS)
+
+
+def load_category_rules(path: str) -> CategoryRules:
+    """
+    Load rules from a .json or .yaml/.yml file:
+
+        categories:        # replaces CATEGORY_DEFINITIONS; order = priority
+          Dining: [STARBUCKS, CAFE]            # or {keywords: [...], description: ...}
+        bank_categories:   # optional, replaces ORIGINAL_CATEGORY_MAPPING
+          FOOD & DINING: Dining
+
+    Raises ValueError if the file cannot be parsed or has the wrong shape.
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+        if yaml is None:
+            raise ValueError(f"{path}: reading YAML rules requires PyYAML")
+        try:
+            raw = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: {e}") from e
+    else:
+        try:
+            raw = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from e
+    
+    if not isinstance(raw, dict) or not isinstance(raw.get('categories', {}), dict):
+        raise ValueError(f"{path}: expected a mapping with a 'categories' mapping")
+    definitions = {}
+    for category, info in (raw.get('categories') or CATEGORY_DEFINITIONS).items():
+        keywords = info.get('keywords') if isinstance(info, dict) else info
+        if not isinstance(keywords, list):
+            raise ValueError(f"{path}: category {category!r} needs a list of keywords")
+        definitions[str(category)] = {
+            'keywords': [str(k).upper() for k in keywords],
+            'description': info.get('description', '') if isinstance(info, dict) else ''
+        }
+    bank_categories = raw.get('bank_categories') or ORIGINAL_CATEGORY_MAPPING
+    if not isinstance(bank_categories, dict):
+        raise ValueError(f"{path}: 'bank_categories' must be a mapping")
+    return build_category_rules(definitions, bank_categories, source=path)
+
+
+def map_original_category(original_category: str, bank_categories: dict = ORIGINAL_CATEGORY_MAPPING) -> str:
+    """Map a bank-supplied category onto ours, falling back to the original or 'Other'."""
+    orig_upper = str(original_category).upper().strip()
+    if orig_upper in bank_categories:
+        return bank_categories[orig_upper]
+    
+    original_category = str(original_category)
+    if original_category.strip() and original_category.lower() != 'nan':
+        return original_category.strip().title()
+    
+    return 'Other'
+
+
+def categorize_transaction(description: str, original_category: str = '',
+                           rules: CategoryRules = DEFAULT_CATEGORY_RULES) -> str:
+    """Category of a single transaction; categorize_transactions on a one-row frame."""
+    row = pd.DataFrame({'description': [str(description)], 'category': [original_category]})
+    return str(categorize_transactions(row, rules)['processed_category'].iloc[0])
+
+
+def match_keywords(descriptions: np.ndarray, patterns) -> np.ndarray:
+    """First matching category per description (None where no keyword matches)."""
+    unique_upper = pd.Series(descriptions, dtype=object).str.upper()
+    keyword_match = np.full(len(descriptions), None, dtype=object)
+    pending = np.ones(len(descriptions), dtype=bool)
+    # One bulk pass per category over the still unresolved descriptions
+    for category, pattern in patterns:
+        if not pending.any():
+            break
+        candidates = np.flatnonzero(pending)
+        hits = unique_upper.iloc[candidates].str.contains(pattern).to_numpy(dtype=bool)
+        keyword_match[candidates[hits]] = category
+        pending[candidates[hits]] = False
+    return keyword_match
+
+
+def _codes_and_uniques(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row codes and unique values; free for categoricals (codes are already there)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.astype(str).to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values.astype(str))
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def categorize_transactions(data: pd.DataFrame, rules: CategoryRules = DEFAULT_CATEGORY_RULES) -> pd.DataFrame:
+    """
+    Shallow copy of `data` with a categorical 'processed_category' from `rules`.
+    Only the distinct descriptions and bank categories are evaluated, so
+    re-running with edited rules costs little even on large histories.
+    """
+    desc_codes, desc_uniques = _codes_and_uniques(data['description'])
+    cat_codes, cat_uniques = _codes_and_uniques(data['category'])
+    
+    keyword_match = match_keywords(desc_uniques, rules.patterns)
+    # Trailing slot covers missing values (code -1)
+    fallback = np.array([map_original_category(c, rules.bank_categories) for c in cat_uniques] + ['Other'],
+                        dtype=object)
+    
+    labels = pd.Index(pd.unique(np.concatenate([keyword_match[pd.notna(keyword_match)], fallback])))
+    keyword_codes = np.append(labels.get_indexer(keyword_match), -1)
+    codes = keyword_codes[desc_codes]
+    unmatched = codes == -1
+    codes[unmatched] = labels.get_indexer(fallback)[cat_codes[unmatched]]
+    
+    categorized = data.copy(deep=False)
+    categorized['processed_category'] = pd.Categorical.from_codes(codes, labels)
+    return categorized
@@ -0,0 +1,123 @@
+"""
+Headless batch ingest: normalize a directory of statement CSVs and write the
+combined dataset plus yearly summaries, without starting Streamlit.
+
+Usage:
+    python -m finance_core statements/ -o output/ --workers 0
+"""
+import argparse
+import cProfile
+import glob
+import json
+import os
+import sys
+
+from finance_core.categorize import DEFAULT_CATEGORY_RULES, load_category_rules
+from finance_core.compat import HAS_PYARROW
+from finance_core.diagnostics import LOADED, StageRecorder, recording
+from finance_core.parallel import create_ingest_pool
+from finance_core.pipeline import ingest_files, summarize
+
+
+def find_statement_files(input_dir: str, pattern: str = '*.csv', recursive: bool = False) -> list[str]:
+    """Statement files under input_dir, sorted so output order is stable."""
+    if recursive:
+        pattern = os.path.join('**', pattern)
+    return sorted(glob.glob(os.path.join(input_dir, pattern), recursive=recursive))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m finance_core',
+        description="Normalize a directory of bank statement CSVs and write yearly summaries."
+    )
+    parser.add_argument('input_dir', help="directory containing statement CSV files")
+    parser.add_argument('-o', '--output-dir', required=True, help="directory for the output files")
+    parser.add_argument('--pattern', default='*.csv', help="file glob within input_dir (default: *.csv)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="search subdirectories too")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="worker processes; 1 = serial (default), 0 = one per CPU core")
+    parser.add_argument('--format', choices=['parquet', 'csv'],
+                        default='parquet' if HAS_PYARROW else 'csv',
+                        help="format for the normalized dataset (parquet requires pyarrow)")
+    parser.add_argument('--rules', metavar='PATH',
+                        help="JSON or YAML category rules file (default: built-in rules)")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="keep transactions that appear in more than one file")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="profile the ingest with cProfile and write pstats to PATH")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.format == 'parquet' and not HAS_PYARROW:
+        print("error: --format parquet requires pyarrow", file=sys.stderr)
+        return 2
+    
+    try:
+        rules = load_category_rules(args.rules) if args.rules else DEFAULT_CATEGORY_RULES
+    except (OSError, ValueError) as e:
+        print(f"error: cannot load rules: {e}", file=sys.stderr)
+        return 2
+    
+    paths = find_statement_files(args.input_dir, args.pattern, args.recursive)
+    if not paths:
+        print(f"error: no files matching {args.pattern!r} in {args.input_dir}", file=sys.stderr)
+        return 1
+    
+    # Paths rather than bytes: files are memory-mapped, and workers receive only the path
+    file_contents = [(os.path.relpath(path, args.input_dir), path) for path in paths]
+    
+    recorder = StageRecorder()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    with recording(recorder):
+        if args.workers == 1:
+            result = ingest_files(file_contents, dedup=not args.keep_duplicates, rules=rules)
+        else:
+            with create_ingest_pool(args.workers) as pool:
+                result = ingest_files(file_contents, executor=pool,
+                                      dedup=not args.keep_duplicates, rules=rules)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    
+    for diagnostic in result.diagnostics:
+        detail = f"{diagnostic.rows} transactions" if diagnostic.status == LOADED else diagnostic.message
+        if diagnostic.format:
+            detail += f" ({diagnostic.format})"
+        if diagnostic.duplicates:
+            detail += f", {diagnostic.duplicates} duplicates of other files dropped"
+        print(f"{diagnostic.status:<8} {diagnostic.filename}: {detail}", file=sys.stderr)
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = {
+        'files': len(paths),
+        'loaded_files': sum(d.status == LOADED for d in result.diagnostics),
+        'transactions': 0 if result.data is None else len(result.data),
+        'duplicates_dropped': sum(d.duplicates for d in result.diagnostics),
+        'stages': recorder.to_list(),
+        'diagnostics': [d.to_dict() for d in result.diagnostics],
+    }
+    with open(os.path.join(args.output_dir, 'ingest_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    
+    if result.data is None:
+        print("error: no valid data could be loaded from any file", file=sys.stderr)
+        return 1
+    
+    dataset_path = os.path.join(args.output_dir, f"transactions.{args.format}")
+    if args.format == 'parquet':
+        result.data.to_parquet(dataset_path, index=False)
+    else:
+        result.data.to_csv(dataset_path, index=False)
+    
+    by_year, by_category = summarize(result.data)
+    by_year.to_csv(os.path.join(args.output_dir, 'summary_by_year.csv'), index=False)
+    by_category.to_csv(os.path.join(args.output_dir, 'summary_by_category.csv'), index=False)
+    
+    print(f"{report['transactions']} transactions from {report['loaded_files']}/{len(paths)} "
+          f"file(s) written to {args.output_dir}")
+    return 0
@@ -0,0 +1,19 @@
+"""Optional dependencies shared across the pipeline."""
+
+try:
+    # Optional: faster vectorized string ops, pyarrow CSV parsing and the Parquet store
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pa = pa_csv = pq = None
+    HAS_PYARROW = False
+
+STRING_DTYPE = 'string[pyarrow]' if HAS_PYARROW else object
+
+try:
+    # Optional: YAML category rules files (JSON needs nothing extra)
+    import yaml
+except ImportError:
+    yaml = None
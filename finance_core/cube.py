@@ -0,0 +1,70 @@
+"""
+Aggregate cube: transaction totals and counts per
+year x month x category x source file x income flag.
+
+Built once per dataset; every dashboard metric, chart and table reads from
+it, so changing the selected year never rescans the raw transactions.
+"""
+import pandas as pd
+
+from finance_core.transactions import month_names
+
+CUBE_DIMENSIONS = ['year', 'month', 'processed_category', 'source_file', 'is_income']
+
+
+def build_aggregate_cube(data: pd.DataFrame) -> pd.DataFrame:
+    """Sum and count transactions per cell; 'total' is in dollars (exact when stored as cents)."""
+    value_col = 'amount_cents' if 'amount_cents' in data.columns else 'amount'
+    cube = data.groupby(CUBE_DIMENSIONS, observed=True, sort=True)[value_col].agg(
+        total='sum', count='count'
+    ).reset_index()
+    if value_col == 'amount_cents':
+        cube['total'] = cube['total'] / 100
+    for col in ['processed_category', 'source_file']:
+        cube[col] = cube[col].astype(str)
+    return cube
+
+
+def cube_years(cube: pd.DataFrame) -> list[int]:
+    """Years present in the dataset, ascending."""
+    return sorted(int(year) for year in cube['year'].unique())
+
+
+def year_slice(cube: pd.DataFrame, year: int, income: bool | None = None) -> pd.DataFrame:
+    """Cells for one year, optionally only income (True) or only expense (False) cells."""
+    cells = cube[cube['year'] == year]
+    if income is not None:
+        cells = cells[cells['is_income'] == income]
+    return cells
+
+
+def year_totals(cube: pd.DataFrame, year: int) -> tuple[float, float]:
+    """(total income, total expenses) for one year; expenses as a positive number."""
+    cells = year_slice(cube, year)
+    income = cells.loc[cells['is_income'], 'total'].sum()
+    expenses = -cells.loc[~cells['is_income'], 'total'].sum()
+    return float(income), float(expenses)
+
+
+def monthly_expenses(cube: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Expenses per month and category: month, month_name, processed_category, abs_amount."""
+    cells = year_slice(cube, year, income=False)
+    monthly = cells.groupby(['month', 'processed_category'], sort=True)['total'].sum().reset_index()
+    monthly['abs_amount'] = -monthly.pop('total')
+    monthly['month_name'] = month_names(monthly['month'])
+    return monthly
+
+
+def category_expenses(cube: pd.DataFrame, year: int) -> pd.Series:
+    """Expense totals per category for one year, largest first."""
+    cells = year_slice(cube, year, income=False)
+    return (-cells.groupby('processed_category')['total'].sum()).sort_values(ascending=False)
+
+
+def source_file_summary(cube: pd.DataFrame, year: int) -> pd.DataFrame:
+    """Transaction count and net amount per source file for one year."""
+    cells = year_slice(cube, year)
+    return cells.groupby('source_file').agg(
+        transactions=('count', 'sum'),
+        total_amount=('total', 'sum')
+    ).reset_index()
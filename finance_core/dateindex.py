@@ -0,0 +1,152 @@
+"""
+Date index: transactions in date order with prefix sums, so any date range is
+two binary searches and its totals (overall or per category) are differences
+of prefix sums. Rolling and cumulative views over many months are computed
+the same way, without masking the full frame per query.
+
+Amounts are summed as integer cents, so range totals are exact.
+"""
+import numpy as np
+import pandas as pd
+
+_DAY_BIAS = 1 << 31  # keeps biased day numbers non-negative in the (category, day) keys
+
+
+def to_day(value) -> int:
+    """Day number (days since 1970-01-01) of a date, Timestamp, datetime64 or ISO string."""
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype('int64'))
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Prefix sums with a leading zero: the sum of values[i:j] is p[j] - p[i]."""
+    return np.concatenate([[0], np.cumsum(values)])
+
+
+def sort_by_date(data: pd.DataFrame) -> pd.DataFrame:
+    """Rows in date order (stable, so same-day rows keep their file order); sorted input is returned as is."""
+    if data['date'].is_monotonic_increasing:
+        return data
+    order = np.argsort(data['date'].to_numpy(), kind='stable')
+    return data.take(order).reset_index(drop=True)
+
+
+class DateIndex:
+    """Date-ordered row positions, plus income/spending prefix sums overall and per category."""
+    
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        days = data['date'].to_numpy().astype('datetime64[D]').astype('int64')
+        # Datasets from pipeline.ingest_files are already date-sorted; other inputs are ordered here
+        self.sorted = bool(np.all(days[1:] >= days[:-1]))
+        self.order = np.arange(len(days)) if self.sorted else np.argsort(days, kind='stable')
+        self.days = days[self.order]
+        
+        if 'amount_cents' in data.columns:
+            cents = data['amount_cents'].to_numpy()
+        else:
+            cents = np.round(data['amount'].to_numpy() * 100).astype('int64')
+        income = np.where(cents > 0, cents, 0)
+        spending = np.where(cents < 0, -cents, 0)
+        self._income = _prefix(income[self.order])
+        self._spending = _prefix(spending[self.order])
+        
+        categories = data['processed_category']
+        if isinstance(categories.dtype, pd.CategoricalDtype):
+            codes, labels = categories.cat.codes.to_numpy(), categories.cat.categories.astype(str)
+        else:
+            codes, labels = pd.factorize(categories)
+            labels = pd.Index(labels).astype(str)
+        self.categories = list(labels)
+        # Rows ordered by (category, day); one searchsorted over these keys finds any category's range
+        keys = (codes.astype('int64') << 32) | (days + _DAY_BIAS)
+        by_category = np.argsort(keys, kind='stable')
+        self._keys = keys[by_category]
+        self._category_income = _prefix(income[by_category])
+        self._category_spending = _prefix(spending[by_category])
+    
+    def __len__(self) -> int:
+        return len(self.days)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index itself; the indexed frame is not counted."""
+        arrays = [self.order, self.days, self._income, self._spending,
+                  self._keys, self._category_income, self._category_spending]
+        return sum(array.nbytes for array in arrays)
+    
+    def bounds(self) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """First and last transaction dates."""
+        first, last = self.days[[0, -1]].astype('datetime64[D]')
+        return pd.Timestamp(first), pd.Timestamp(last)
+    
+    def _span(self, start, end) -> tuple[int, int]:
+        """Sorted-row bounds [lo, hi) of the inclusive date range start..end."""
+        lo = np.searchsorted(self.days, to_day(start), side='left')
+        hi = np.searchsorted(self.days, to_day(end) + 1, side='left')
+        return int(lo), int(max(lo, hi))
+    
+    def positions(self, start, end) -> np.ndarray:
+        """Row positions in `data` dated start..end (inclusive), in date order."""
+        lo, hi = self._span(start, end)
+        return self.order[lo:hi]
+    
+    def slice(self, start, end) -> pd.DataFrame:
+        """Rows dated start..end (inclusive); a zero-copy slice when `data` is date-sorted."""
+        lo, hi = self._span(start, end)
+        return self.data.iloc[lo:hi] if self.sorted else self.data.iloc[self.order[lo:hi]]
+    
+    def totals(self, start, end) -> dict:
+        """Income, spending (positive), net and transaction count for start..end."""
+        lo, hi = self._span(start, end)
+        income = int(self._income[hi] - self._income[lo]) / 100
+        spending = int(self._spending[hi] - self._spending[lo]) / 100
+        return {'income': income, 'spending': spending, 'net': income - spending, 'transactions': hi - lo}
+    
+    def _category_prefix(self, days: np.ndarray, prefix: np.ndarray) -> np.ndarray:
+        """prefix value per category (rows) at each day boundary (columns), i.e. sums before that day."""
+        category_codes = np.arange(len(self.categories), dtype='int64')[:, None] << 32
+        idx = np.searchsorted(self._keys, category_codes | (days[None, :] + _DAY_BIAS), side='left')
+        return prefix[idx]
+    
+    def category_totals(self, start, end) -> pd.DataFrame:
+        """Per category: income, spending (positive) and net for start..end, largest spending first."""
+        boundaries = np.array([to_day(start), to_day(end) + 1])
+        totals = pd.DataFrame({
+            'income': np.diff(self._category_prefix(boundaries, self._category_income), axis=1)[:, 0],
+            'spending': np.diff(self._category_prefix(boundaries, self._category_spending), axis=1)[:, 0],
+        }, index=pd.Index(self.categories, name='category')) / 100
+        totals['net'] = totals['income'] - totals['spending']
+        totals = totals[(totals['income'] != 0) | (totals['spending'] != 0)]
+        return totals.sort_values('spending', ascending=False)
+    
+    def rolling_monthly(self, start, end, window: int = 1, measure: str = 'spending') -> pd.DataFrame:
+        """
+        Trailing `window`-month totals of 'spending' or 'income' per category,
+        one row per calendar month from start's month to end's month. The
+        first months include data before `start` when the window reaches back.
+        """
+        first = np.datetime64(pd.Timestamp(start).date(), 'M')
+        last = np.datetime64(pd.Timestamp(end).date(), 'M')
+        # Month starts from window - 1 months before `first` up to the month after `last`
+        month_starts = np.arange(first - (window - 1), last + 2)
+        boundaries = month_starts.astype('datetime64[D]').astype('int64')
+        prefix = self._category_income if measure == 'income' else self._category_spending
+        at_boundary = self._category_prefix(boundaries, prefix)
+        sums = at_boundary[:, window:] - at_boundary[:, :-window]
+        months = pd.DatetimeIndex(month_starts[window - 1:-1].astype('datetime64[ns]'), name='month')
+        return pd.DataFrame(sums.T / 100, index=months, columns=self.categories)
+    
+    def cumulative(self, start, end, measure: str = 'spending') -> pd.DataFrame:
+        """
+        Running totals of 'spending' or 'income' per category from start,
+        one row per month end (the last row is at `end`).
+        """
+        first, last = to_day(start), to_day(end) + 1
+        month_ends = np.arange(np.datetime64(pd.Timestamp(start).date(), 'M') + 1,
+                               np.datetime64(pd.Timestamp(end).date(), 'M') + 1)
+        boundaries = np.concatenate([[first], month_ends.astype('datetime64[D]').astype('int64'), [last]])
+        prefix = self._category_income if measure == 'income' else self._category_spending
+        at_boundary = self._category_prefix(boundaries, prefix)
+        running = at_boundary[:, 1:] - at_boundary[:, :1]
+        dates = pd.DatetimeIndex((boundaries[1:] - 1).astype('datetime64[D]').astype('datetime64[ns]'), name='date')
+        return pd.DataFrame(running.T / 100, index=dates, columns=self.categories)
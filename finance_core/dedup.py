@@ -0,0 +1,112 @@
+"""
+Duplicate detection across overlapping statements: a transaction exported in
+more than one file (a monthly and a quarterly statement, or the same card
+exported twice) is kept once, from the first file that contains it.
+
+Rows are matched on a hash of (amount in cents, normalized description) plus
+the day, allowing the day to differ by up to DEDUP_DATE_TOLERANCE_DAYS (post
+date vs. transaction date). Matching is a multiset match: two identical
+coffees in one file cancel at most two in another. Rows within one file are
+never compared with each other, since repeated purchases are legitimate.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DEDUP_ENABLED = os.environ.get('FINANCE_APP_DEDUP', '1').lower() not in ('0', 'false', 'no')
+DEDUP_DATE_TOLERANCE_DAYS = int(os.environ.get('FINANCE_APP_DEDUP_DAYS', '3'))
+
+_AMOUNT_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize_descriptions(descriptions: pd.Series) -> pd.Series:
+    """Upper-case with whitespace runs collapsed, so cosmetic export differences still match."""
+    return descriptions.astype(str).str.upper().str.split().str.join(' ')
+
+
+def transaction_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Per row: 'key' hashing amount and normalized description, and 'day' as days since epoch."""
+    descriptions = df['description']
+    if isinstance(descriptions.dtype, pd.CategoricalDtype):
+        codes, uniques = descriptions.cat.codes.to_numpy(), descriptions.cat.categories.to_series()
+    else:
+        codes, uniques = pd.factorize(descriptions.fillna(''))
+        uniques = pd.Series(uniques)
+    # Normalize and hash each distinct description once
+    description_hash = pd.util.hash_array(normalize_descriptions(uniques).to_numpy(dtype=object))
+    if 'amount_cents' in df.columns:
+        cents = df['amount_cents'].to_numpy()
+    else:
+        cents = np.round(df['amount'].to_numpy() * 100).astype('int64')
+    return pd.DataFrame({
+        'key': description_hash[codes] ^ (cents.astype('uint64') * _AMOUNT_MIX),
+        'day': df['date'].to_numpy().astype('datetime64[D]').astype('int64'),
+    })
+
+
+def _date_shifts(tolerance_days: int) -> list[int]:
+    """Exact day first, then increasingly distant shifts: 0, 1, -1, 2, -2, ..."""
+    shifts = [0]
+    for days in range(1, tolerance_days + 1):
+        shifts += [days, -days]
+    return shifts
+
+
+def find_duplicates(keys: pd.DataFrame, seen: pd.DataFrame, tolerance_days: int) -> np.ndarray:
+    """
+    Boolean mask of `keys` rows matching a distinct row of `seen`. Each pass is
+    a hash join on (key, day, occurrence number), so the cost is linear.
+    """
+    duplicate = np.zeros(len(keys), dtype=bool)
+    shared = keys['key'].isin(seen['key']).to_numpy()
+    if seen.empty or not shared.any():
+        return duplicate
+    
+    seen = seen[seen['key'].isin(keys['key'][shared])].reset_index(drop=True)
+    consumed = np.zeros(len(seen), dtype=bool)
+    pending = np.flatnonzero(shared)
+    for shift in _date_shifts(tolerance_days):
+        candidates = pd.DataFrame({
+            'key': keys['key'].to_numpy()[pending],
+            'day': keys['day'].to_numpy()[pending] + shift,
+            'row': pending,
+        })
+        candidates['occurrence'] = candidates.groupby(['key', 'day']).cumcount()
+        available = seen[~consumed].assign(seen_row=np.flatnonzero(~consumed))
+        available['occurrence'] = available.groupby(['key', 'day']).cumcount()
+        
+        matched = candidates.merge(available, on=['key', 'day', 'occurrence'])
+        duplicate[matched['row'].to_numpy()] = True
+        consumed[matched['seen_row'].to_numpy()] = True
+        pending = pending[~duplicate[pending]]
+        if len(pending) == 0 or consumed.all():
+            break
+    return duplicate
+
+
+def drop_duplicate_transactions(frames: list[pd.DataFrame],
+                                tolerance_days: int = DEDUP_DATE_TOLERANCE_DAYS,
+                                existing: pd.DataFrame | None = None) -> tuple[list[pd.DataFrame], list[int]]:
+    """
+    Drop rows already present in an earlier frame (or in `existing`).
+    Returns the kept frames and the number of rows dropped from each.
+    """
+    seen = [transaction_keys(existing)] if existing is not None and not existing.empty else []
+    kept, dropped = [], []
+    for df in frames:
+        keys = transaction_keys(df)
+        # Only rows sharing a key with this file can match, so narrow each earlier file first
+        candidates = [s[s['key'].isin(keys['key'])] for s in seen]
+        candidates = [c for c in candidates if not c.empty]
+        duplicate = np.zeros(len(df), dtype=bool)
+        if candidates:
+            duplicate = find_duplicates(keys, pd.concat(candidates, ignore_index=True), tolerance_days)
+        
+        dropped.append(int(duplicate.sum()))
+        if duplicate.any():
+            df = df[~duplicate]
+            keys = keys[~duplicate]
+        kept.append(df)
+        seen.append(keys)
+    return kept, dropped
@@ -0,0 +1,114 @@
+"""
+Structured diagnostics (no UI calls in the pipeline): per-file ingest
+outcomes and per-stage wall time, row counts and memory deltas.
+"""
+import contextlib
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+LOADED = 'loaded'
+WARNING = 'warning'
+ERROR = 'error'
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Wall time, input rows and resident-memory change of one pipeline stage."""
+    stage: str
+    seconds: float
+    rows: int | None = None
+    memory_delta_mb: float | None = None
+
+
+@dataclass(frozen=True)
+class FileDiagnostic:
+    """Outcome of ingesting one file: status is LOADED, WARNING or ERROR."""
+    filename: str
+    status: str
+    rows: int = 0
+    message: str = ''
+    stages: tuple[StageTiming, ...] = ()
+    duplicates: int = 0  # rows dropped as already present in another file
+    format: str = ''  # statement format used, e.g. 'Chase (credit card)'
+    
+    @property
+    def ok(self) -> bool:
+        return self.status == LOADED
+    
+    @property
+    def seconds(self) -> float:
+        return sum(timing.seconds for timing in self.stages)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def current_rss_bytes() -> int | None:
+    """Resident set size of this process, where the platform exposes it cheaply."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class StageRecorder:
+    """Collects StageTimings; repeated stages (e.g. one per chunk) are summed in summary()."""
+    
+    def __init__(self):
+        self.timings = []
+    
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            rss_after = current_rss_bytes()
+            delta = None
+            if rss_before is not None and rss_after is not None:
+                delta = (rss_after - rss_before) / 1024**2
+            self.timings.append(StageTiming(name, seconds, rows, delta))
+    
+    def summary(self) -> tuple[StageTiming, ...]:
+        merged = {}
+        for timing in self.timings:
+            if timing.stage not in merged:
+                merged[timing.stage] = timing
+                continue
+            prev = merged[timing.stage]
+            merged[timing.stage] = StageTiming(
+                timing.stage, prev.seconds + timing.seconds,
+                None if prev.rows is None or timing.rows is None else prev.rows + timing.rows,
+                None if prev.memory_delta_mb is None or timing.memory_delta_mb is None
+                else prev.memory_delta_mb + timing.memory_delta_mb
+            )
+        return tuple(merged.values())
+    
+    def to_list(self) -> list[dict]:
+        return [asdict(timing) for timing in self.summary()]
+
+
+_active_recorder: ContextVar[StageRecorder | None] = ContextVar('active_recorder', default=None)
+
+
+@contextlib.contextmanager
+def recording(recorder: StageRecorder):
+    """Make `recorder` receive stage() timings from pipeline code in this context."""
+    token = _active_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active_recorder.reset(token)
+
+
+def stage(name: str, rows: int | None = None):
+    """Time a stage into the active recorder; a no-op when nothing is recording."""
+    recorder = _active_recorder.get()
+    if recorder is None:
+        return contextlib.nullcontext()
+    return recorder.stage(name, rows)
@@ -0,0 +1,97 @@
+"""
+Transaction explorer index: built once per dataset, then every search,
+filter and page is answered from precomputed arrays, so only the visible
+page of rows is ever materialized.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+EXPLORER_COLUMNS = ['date', 'description', 'processed_category', 'amount', 'source_file']
+
+
+def _codes_and_labels(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Integer code per row (-1 for missing) and the label for each code."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.astype(str).to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    return codes, np.asarray(uniques.astype(str), dtype=object)
+
+
+def _code_mask(codes: np.ndarray, selected: np.ndarray, n_labels: int) -> np.ndarray:
+    """Rows whose code is in `selected`; the extra slot makes code -1 never match."""
+    lookup = np.zeros(n_labels + 1, dtype=bool)
+    lookup[selected] = True
+    return lookup[codes]
+
+
+class TransactionIndex:
+    """Date-sorted row order plus description, category and source-file dictionaries."""
+    
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        # Newest first; stable, so same-day rows keep their file order
+        self.order = np.argsort(-data['date'].to_numpy().astype('int64'), kind='stable')
+        self._years = data['year'].to_numpy()[self.order]
+        
+        codes, labels = _codes_and_labels(data['description'])
+        self._description_codes = codes[self.order]
+        self._descriptions = pd.Series(labels).str.lower()
+        # Sorted lower-cased descriptions for prefix search by binary search
+        self._prefix_codes = np.argsort(self._descriptions.to_numpy(), kind='stable')
+        self._prefix_sorted = self._descriptions.to_numpy()[self._prefix_codes]
+        
+        self._facets = {}
+        for col in ['processed_category', 'source_file']:
+            codes, labels = _codes_and_labels(data[col])
+            self._facets[col] = (codes[self.order], labels)
+        
+        # Re-running the script with the same search text must not rescan
+        self.matching_descriptions = functools.lru_cache(maxsize=256)(self._matching_descriptions)
+    
+    def __len__(self) -> int:
+        return len(self.order)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index itself; the indexed frame is not counted."""
+        arrays = [self.order, self._years, self._description_codes, self._prefix_codes, self._prefix_sorted]
+        arrays += [array for facet in self._facets.values() for array in facet]
+        return sum(array.nbytes for array in arrays) + int(self._descriptions.memory_usage(deep=True))
+    
+    def facet_values(self, column: str) -> list[str]:
+        """Sorted labels present in the dataset for 'processed_category' or 'source_file'."""
+        codes, labels = self._facets[column]
+        present = np.unique(codes[codes >= 0])
+        return sorted(labels[present])
+    
+    def _matching_descriptions(self, text: str, prefix: bool) -> np.ndarray:
+        """Description codes matching `text` (case-insensitive), scanning unique descriptions only."""
+        text = text.lower()
+        if prefix:
+            start = np.searchsorted(self._prefix_sorted, text, side='left')
+            stop = np.searchsorted(self._prefix_sorted, text + '\uffff', side='left')
+            return self._prefix_codes[start:stop]
+        return np.flatnonzero(self._descriptions.str.contains(text, regex=False).to_numpy())
+    
+    def query(self, year: int | None = None, search: str = '', prefix: bool = False,
+              categories: list[str] | None = None, sources: list[str] | None = None) -> np.ndarray:
+        """Row positions in `data` matching every given filter, newest first."""
+        mask = np.ones(len(self.order), dtype=bool)
+        if year is not None:
+            mask &= self._years == year
+        search = search.strip()
+        if search:
+            matched = self.matching_descriptions(search, prefix)
+            mask &= _code_mask(self._description_codes, matched, len(self._descriptions))
+        for col, selected in [('processed_category', categories), ('source_file', sources)]:
+            if selected:
+                codes, labels = self._facets[col]
+                mask &= _code_mask(codes, np.flatnonzero(np.isin(labels, selected)), len(labels))
+        return self.order[mask]
+    
+    def page(self, positions: np.ndarray, number: int, size: int) -> pd.DataFrame:
+        """Rows of page `number` (1-based) of `positions`; nothing outside it is copied."""
+        start = (number - 1) * size
+        return self.data.iloc[positions[start:start + size]]
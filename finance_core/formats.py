@@ -0,0 +1,202 @@
+"""
+Bank format registry: statement layouts keyed by a fingerprint of the header
+row (or, for headerless files, the shape of the first row) plus encoding and
+delimiter. A known layout maps straight to its columns, date format and sign
+convention, skipping the column-guessing heuristics in normalize.
+
+Ships with profiles for common bank exports; layouts resolved by the
+heuristics are learned and persisted to FORMATS_FILE.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+
+# Learned formats are saved here; set FINANCE_APP_FORMATS_FILE='' to keep them in memory only
+FORMATS_FILE = os.environ.get(
+    'FINANCE_APP_FORMATS_FILE', os.path.join(os.path.expanduser('~'), '.finance_app', 'formats.json')
+)
+
+_DATE_CELL = re.compile(r'^\d{1,4}[/-]\d{1,2}[/-]\d{1,4}')
+_NUMBER_CELL = re.compile(r'^\(?-?\$?-?[\d,]*\.?\d+\)?$')
+
+
+@dataclass(frozen=True)
+class StatementFormat:
+    """
+    Resolved layout of one kind of statement export. Column fields hold header
+    names (None if absent); amount_sign is -1 for banks that export charges as
+    positive amounts. column_names is set for headerless layouts.
+    """
+    name: str
+    date_column: str | None
+    description_column: str | None
+    amount_column: str | None = None
+    debit_column: str | None = None
+    credit_column: str | None = None
+    category_column: str | None = None
+    date_format: str | None = None
+    amount_sign: int = 1
+    column_names: tuple[str, ...] | None = None
+    
+    @property
+    def columns(self) -> list[str]:
+        """Every column this format reads."""
+        return [c for c in (self.date_column, self.description_column, self.amount_column,
+                            self.debit_column, self.credit_column, self.category_column) if c]
+    
+    @property
+    def learnable(self) -> bool:
+        """Complete enough to skip the heuristics next time."""
+        has_amount = self.amount_column or self.debit_column or self.credit_column
+        return bool(self.date_column and self.date_format and has_amount)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'StatementFormat':
+        data = dict(data)
+        if data.get('column_names') is not None:
+            data['column_names'] = tuple(data['column_names'])
+        return cls(**data)
+
+
+def cell_kind(value: str) -> str:
+    """Coarse type of one CSV cell, used to fingerprint headerless files."""
+    value = value.strip()
+    if not value:
+        return 'empty'
+    if _DATE_CELL.match(value):
+        return 'date'
+    if _NUMBER_CELL.match(value.replace(' ', '')):
+        return 'number'
+    return 'text'
+
+
+def _fingerprint(encoding: str, delimiter: str, parts: list[str]) -> str:
+    key = '\x1f'.join([encoding, delimiter] + parts)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]
+
+
+def layout_fingerprint(first_row: list[str], encoding: str, delimiter: str, headerless: bool) -> str:
+    """Key for a layout: normalized header names, or cell kinds of the first row if headerless."""
+    if headerless:
+        return _fingerprint(encoding, delimiter, ['headerless'] + [cell_kind(cell) for cell in first_row])
+    return _fingerprint(encoding, delimiter, ['header'] + [cell.strip().lower() for cell in first_row])
+
+
+# Built-in profiles: (header row or headerless first-row kinds, format)
+BUILTIN_FORMATS = [
+    (['Transaction Date', 'Post Date', 'Description', 'Category', 'Type', 'Amount', 'Memo'],
+     StatementFormat('Chase (credit card)', 'Transaction Date', 'Description', amount_column='Amount',
+                     category_column='Category', date_format='%m/%d/%Y')),
+    (['Transaction Date', 'Posted Date', 'Card No.', 'Description', 'Category', 'Debit', 'Credit'],
+     StatementFormat('Capital One', 'Transaction Date', 'Description', debit_column='Debit',
+                     credit_column='Credit', category_column='Category', date_format='%Y-%m-%d')),
+    (['Date', 'Description', 'Card Member', 'Account #', 'Amount'],
+     StatementFormat('American Express', 'Date', 'Description', amount_column='Amount',
+                     date_format='%m/%d/%Y', amount_sign=-1)),
+    (['Date', 'Description', 'Card Member', 'Account #', 'Amount', 'Extended Details',
+      'Appears On Your Statement As', 'Address', 'City/State', 'Zip Code', 'Country', 'Reference', 'Category'],
+     StatementFormat('American Express (extended)', 'Date', 'Description', amount_column='Amount',
+                     category_column='Category', date_format='%m/%d/%Y', amount_sign=-1)),
+    (['date', 'number', 'text', 'empty', 'text'],
+     StatementFormat('Wells Fargo', 'Date', 'Description', amount_column='Amount', date_format='%m/%d/%Y',
+                     column_names=('Date', 'Amount', 'Flag', 'Check Number', 'Description'))),
+    (['date', 'number', 'text', 'number', 'text'],
+     StatementFormat('Wells Fargo', 'Date', 'Description', amount_column='Amount', date_format='%m/%d/%Y',
+                     column_names=('Date', 'Amount', 'Flag', 'Check Number', 'Description'))),
+    (['Date', 'Description', 'Amount', 'Running Bal.'],
+     StatementFormat('Bank of America (checking)', 'Date', 'Description', amount_column='Amount',
+                     date_format='%m/%d/%Y')),
+    (['Posted Date', 'Reference Number', 'Payee', 'Address', 'Amount'],
+     StatementFormat('Bank of America (credit card)', 'Posted Date', 'Payee', amount_column='Amount',
+                     date_format='%m/%d/%Y')),
+]
+
+
+def builtin_fingerprints() -> dict[str, StatementFormat]:
+    """Built-in profiles keyed for UTF-8 and latin-1 exports with comma delimiters."""
+    formats = {}
+    for row, fmt in BUILTIN_FORMATS:
+        if fmt.column_names is not None:
+            parts = ['headerless'] + row
+        else:
+            parts = ['header'] + [name.lower() for name in row]
+        for encoding in ('utf-8', 'latin-1'):
+            formats[_fingerprint(encoding, ',', parts)] = fmt
+    return formats
+
+
+class FormatRegistry:
+    """Thread-safe fingerprint -> StatementFormat lookup; learned formats persist to `path`."""
+    
+    def __init__(self, path: str | None = FORMATS_FILE):
+        self.path = path or None
+        self._builtin = builtin_fingerprints()
+        self._learned = {}
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+        self._reload()
+    
+    def _reload(self) -> None:
+        """Pick up formats learned by other processes since the last read."""
+        if self.path is None:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._loaded_mtime:
+                return
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self._learned.update({k: StatementFormat.from_dict(v) for k, v in saved.items()})
+            self._loaded_mtime = mtime
+        except (OSError, ValueError, TypeError):
+            pass  # missing or unreadable file: start from the built-ins
+    
+    def lookup(self, fingerprint: str) -> StatementFormat | None:
+        with self._lock:
+            if fingerprint in self._builtin:
+                return self._builtin[fingerprint]
+            if fingerprint not in self._learned:
+                self._reload()
+            return self._learned.get(fingerprint)
+    
+    def learn(self, fingerprint: str, fmt: StatementFormat) -> None:
+        """Remember a resolved layout and save it; save failures keep it in memory only."""
+        with self._lock:
+            if fingerprint in self._builtin or self._learned.get(fingerprint) == fmt:
+                return
+            self._reload()
+            self._learned[fingerprint] = fmt
+            if self.path is None:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({k: v.to_dict() for k, v in self._learned.items()}, f, indent=2)
+                os.replace(tmp_path, self.path)
+                self._loaded_mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                pass
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._builtin) + len(self._learned)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_format_registry() -> FormatRegistry:
+    """The registry for this process (each ingest worker process has its own)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = FormatRegistry()
+        return _registry
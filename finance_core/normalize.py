@@ -0,0 +1,252 @@
+"""Normalize bank statement DataFrames to the target schema."""
+import re
+
+import numpy as np
+import pandas as pd
+
+from finance_core.compat import STRING_DTYPE
+from finance_core.diagnostics import stage
+from finance_core.formats import StatementFormat
+
+# ============================================================================
+# TARGET SCHEMA - All files will be normalized to this structure
+# ============================================================================
+TARGET_SCHEMA = ['date', 'description', 'amount', 'category', 'source_file']
+
+# Column mapping: maps various bank column names to our target schema
+COLUMN_MAPPINGS = {
+    'date': [
+        'transaction date', 'transactiondate', 'trans date', 'date', 
+        'post date', 'postdate', 'posted date', 'posteddate'
+    ],
+    'description': [
+        'description', 'desc', 'details', 'merchant', 'vendor', 
+        'name', 'payee', 'memo', 'transaction description'
+    ],
+    'amount': [
+        'amount', 'amt', 'transaction amount', 'transactionamount'
+    ],
+    'category': [
+        'category', 'cat', 'type', 'transaction type', 'transactiontype'
+    ],
+    'debit': ['debit', 'debits', 'withdrawal', 'withdrawals'],
+    'credit': ['credit', 'credits', 'deposit', 'deposits']
+}
+
+# Date formats tried in priority order; the first one that fits a sample wins
+DATE_FORMATS = ['%m/%d/%Y', '%Y-%m-%d', '%m-%d-%Y', '%d/%m/%Y',
+                '%m/%d/%y', '%Y/%m/%d', '%m/%d/%Y %H:%M:%S']
+DATE_SAMPLE_SIZE = 200
+
+# A comma followed by one or two final digits is a decimal comma ("-5,00", "1.234,56");
+# thousands separators are always followed by three
+DECIMAL_COMMA = r',\d{1,2}\)?$'
+
+
+# ============================================================================
+# CORE DATA LOADING - NORMALIZE EACH FILE INDEPENDENTLY
+# ============================================================================
+
+def find_column(df_columns: list, target_names: list) -> str | None:
+    """Find a column matching any of the target names (case-insensitive)."""
+    df_cols_lower = {col.lower().strip(): col for col in df_columns}
+    for target in target_names:
+        if target.lower() in df_cols_lower:
+            return df_cols_lower[target.lower()]
+    return None
+
+
+def clean_amount(value) -> float:
+    """Convert amount string to float, handling currency symbols, parentheses and decimal commas."""
+    if pd.isna(value):
+        return 0.0
+    val_str = str(value).replace('$', '').strip()
+    if re.search(DECIMAL_COMMA, val_str):
+        val_str = val_str.replace('.', '').replace(',', '.')
+    # Remove currency symbols and thousands separators
+    val_str = val_str.replace(',', '').strip()
+    # Handle parentheses as negative (accounting format)
+    if val_str.startswith('(') and val_str.endswith(')'):
+        val_str = '-' + val_str[1:-1]
+    try:
+        return float(val_str)
+    except ValueError:
+        return 0.0
+
+
+def parse_amounts(values: pd.Series, cents: bool = False) -> pd.Series:
+    """
+    Vectorized clean_amount over a whole column.
+    Returns float64 dollars (or int64 cents); unparseable values become 0.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        amounts = values.astype('float64').fillna(0.0).to_numpy()
+    else:
+        # Parse each distinct string once; bank exports repeat amounts heavily
+        codes, uniques = pd.factorize(values)
+        text = pd.Series(uniques, dtype=object).astype(str).astype(STRING_DTYPE)
+        text = text.str.replace('$', '', regex=False).str.strip()
+        decimal_comma = text.str.contains(DECIMAL_COMMA, regex=True).fillna(False).astype(bool)
+        text = text.mask(decimal_comma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+        text = text.str.replace(',', '', regex=False)
+        # Handle parentheses as negative (accounting format)
+        parens = (text.str.startswith('(') & text.str.endswith(')')).fillna(False).astype(bool)
+        text = text.mask(parens, '-' + text.str.slice(1, -1))
+        parsed = pd.to_numeric(text, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        parsed = np.nan_to_num(parsed, nan=0.0, posinf=0.0, neginf=0.0)
+        amounts = np.where(codes >= 0, parsed[codes] if len(parsed) else 0.0, 0.0)
+    
+    if cents:
+        return pd.Series(np.round(amounts * 100).astype('int64'), index=values.index)
+    return pd.Series(amounts, index=values.index, dtype='float64')
+
+
+def detect_date_format(values: pd.Series, sample_size: int = DATE_SAMPLE_SIZE) -> str | None:
+    """Return the first of DATE_FORMATS that parses >50% of a small, evenly spaced sample."""
+    sample = values.dropna()
+    if sample.empty:
+        return None
+    if len(sample) > sample_size:
+        positions = np.linspace(0, len(sample) - 1, sample_size).astype(int)
+        sample = sample.iloc[positions]
+    sample = sample.astype(str)
+    
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=fmt, errors='coerce')
+        if parsed.notna().mean() > 0.5:  # >50% success
+            return fmt
+    return None
+
+
+def parse_date_column(values: pd.Series, date_format: str | None = None) -> pd.Series:
+    """
+    Parse a date column with a single full-column pass using date_format, or
+    the detected format if none is given or the given one fits too few rows.
+    Rows that don't match it get a per-row fallback, one parse per distinct value.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    
+    fmt = date_format or detect_date_format(values)
+    if fmt is None:
+        parsed = pd.to_datetime(values, errors='coerce')
+    else:
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    if date_format and parsed.notna().sum() <= values.notna().sum() * 0.5:
+        # A remembered format that no longer fits this file
+        return parse_date_column(values)
+    
+    # Only worth retrying when the stragglers are a minority (mixed-format files)
+    failed = parsed.isna() & values.notna()
+    if failed.any() and failed.sum() <= values.notna().sum() * 0.5:
+        retry = values[failed].astype(str)
+        distinct = retry.unique()
+        fallback = pd.to_datetime(pd.Series(distinct), format='mixed', errors='coerce')
+        if pd.api.types.is_datetime64_dtype(fallback):
+            parsed = parsed.copy()
+            parsed[failed] = retry.map(pd.Series(fallback.to_numpy(), index=distinct)).to_numpy()
+    
+    return parsed
+
+
+def resolve_statement_format(df: pd.DataFrame, name: str = 'detected') -> StatementFormat:
+    """
+    Work out a file's layout from its column names and contents: the
+    heuristics that a known format (see formats.FormatRegistry) skips.
+    """
+    # --- DATE column: by name, else the first column whose values look like dates ---
+    date_col = find_column(df.columns, COLUMN_MAPPINGS['date'])
+    if not date_col:
+        for col in df.columns:
+            sample = df[col].dropna().head(10).astype(str)
+            if sample.str.contains(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}').mean() > 0.5:
+                date_col = col
+                break
+    
+    # --- AMOUNT: single column, debit/credit pair, else any numeric-looking column ---
+    amount_col = find_column(df.columns, COLUMN_MAPPINGS['amount'])
+    debit_col = credit_col = None
+    if not amount_col:
+        debit_col = find_column(df.columns, COLUMN_MAPPINGS['debit'])
+        credit_col = find_column(df.columns, COLUMN_MAPPINGS['credit'])
+    if not (amount_col or debit_col or credit_col):
+        for col in df.columns:
+            if col.lower() in ['date', 'description', 'category', 'type', 'memo']:
+                continue
+            sample = df[col].dropna().head(20)
+            try:
+                cleaned = parse_amounts(sample)
+                if cleaned.abs().mean() > 0.01 and cleaned.abs().mean() < 1000000:
+                    amount_col = col
+                    break
+            except:
+                continue
+    
+    return StatementFormat(
+        name, date_col,
+        find_column(df.columns, COLUMN_MAPPINGS['description']),
+        amount_column=amount_col, debit_column=debit_col, credit_column=credit_col,
+        category_column=find_column(df.columns, COLUMN_MAPPINGS['category']),
+        date_format=detect_date_format(df[date_col]) if date_col else None
+    )
+
+
+def normalize_single_file(df: pd.DataFrame, filename: str, fmt: StatementFormat | None = None) -> pd.DataFrame:
+    """
+    Normalize a single dataframe to the target schema.
+    This is the CRITICAL function that ensures all files have identical columns.
+    With a known `fmt` the columns are taken from it directly; otherwise (or if
+    the file lacks its columns) they are resolved with resolve_statement_format.
+    """
+    if fmt is None or any(find_column(df.columns, [col]) is None for col in fmt.columns):
+        with stage('resolve_format', rows=len(df)):
+            fmt = resolve_statement_format(df)
+    
+    def column(name: str) -> pd.Series:
+        return df[find_column(df.columns, [name])]
+    
+    normalized = pd.DataFrame()
+    
+    # --- 1. Normalize DATE column ---
+    with stage('date_parse', rows=len(df)):
+        if fmt.date_column:
+            normalized['date'] = parse_date_column(column(fmt.date_column), fmt.date_format)
+        else:
+            normalized['date'] = pd.NaT  # Fill with NaT if no date found
+    
+    # --- 2. Normalize DESCRIPTION column ---
+    if fmt.description_column:
+        normalized['description'] = column(fmt.description_column).fillna('').astype(str)
+    else:
+        normalized['description'] = 'Unknown'
+    
+    # --- 3. Normalize AMOUNT column(s) ---
+    with stage('amount_parse', rows=len(df)):
+        if fmt.amount_column:
+            normalized['amount'] = parse_amounts(column(fmt.amount_column))
+        elif fmt.debit_column and fmt.credit_column:
+            # Debit/Credit format (Capital One, some banks)
+            debits = parse_amounts(column(fmt.debit_column))
+            credits = parse_amounts(column(fmt.credit_column))
+            normalized['amount'] = credits - debits  # Credits positive, debits negative
+        elif fmt.debit_column:
+            normalized['amount'] = -parse_amounts(column(fmt.debit_column))  # Debits as negative
+        elif fmt.credit_column:
+            normalized['amount'] = parse_amounts(column(fmt.credit_column))
+        else:
+            normalized['amount'] = 0.0
+        if fmt.amount_sign != 1:
+            # e.g. Amex exports charges as positive amounts
+            normalized['amount'] = normalized['amount'] * fmt.amount_sign
+    
+    # --- 4. Normalize CATEGORY column ---
+    if fmt.category_column:
+        normalized['category'] = column(fmt.category_column).fillna('Other').astype(str)
+    else:
+        normalized['category'] = 'Other'
+    
+    # --- 5. Add source file tracking ---
+    normalized['source_file'] = filename
+    
+    # Categorization (processed_category) runs later, on the combined data: see categorize_transactions
+    return normalized
@@ -0,0 +1,45 @@
+"""Parallel multi-file ingest across CPU cores."""
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import pandas as pd
+
+from finance_core.diagnostics import ERROR, FileDiagnostic
+from finance_core.reader import process_statement_file
+
+
+def resolve_worker_count(workers: int) -> int:
+    """Zero or a negative count means one worker per CPU core."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def create_ingest_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool for file ingest. Uses 'spawn' so it is safe to start from a
+    threaded server such as Streamlit; workers only import finance_core.
+    """
+    return ProcessPoolExecutor(
+        max_workers=resolve_worker_count(workers),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+def process_files(file_contents: list[tuple[str, bytes]],
+                  executor: Executor | None = None) -> list[tuple[pd.DataFrame | None, FileDiagnostic]]:
+    """
+    Run process_statement_file over every file, concurrently when an executor
+    is given. Results always come back in input order.
+    """
+    if executor is None or len(file_contents) < 2:
+        return [process_statement_file(filename, content) for filename, content in file_contents]
+    
+    futures = [executor.submit(process_statement_file, filename, content)
+               for filename, content in file_contents]
+    results = []
+    for (filename, _), future in zip(file_contents, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:  # e.g. a worker process died
+            results.append((None, FileDiagnostic(filename, ERROR, message=str(e))))
+    return results
@@ -0,0 +1,162 @@
+"""
+Headless ingest pipeline: files in, combined transactions and structured
+diagnostics out. Callers (the Streamlit app, the CLI) decide how to report.
+"""
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+
+import pandas as pd
+
+from finance_core.cache import IngestCache, dataset_digest
+from finance_core.categorize import DEFAULT_CATEGORY_RULES, CategoryRules, categorize_transactions
+from finance_core.cube import build_aggregate_cube
+from finance_core.dateindex import sort_by_date
+from finance_core.dedup import DEDUP_ENABLED, drop_duplicate_transactions
+from finance_core.diagnostics import FileDiagnostic, stage
+from finance_core.parallel import process_files
+from finance_core.spool import source_digest
+from finance_core.store import TransactionStore
+from finance_core.transactions import concat_transactions
+
+
+@dataclass
+class IngestResult:
+    """Combined transactions (None if nothing loaded) and one diagnostic per input file."""
+    data: pd.DataFrame | None
+    diagnostics: list[FileDiagnostic] = field(default_factory=list)
+    digests: list[str] = field(default_factory=list)
+    
+    @property
+    def dataset_key(self) -> str:
+        return dataset_digest(self.digests)
+    
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.memory_usage(deep=True).sum()) if self.data is not None else 0
+
+
+def get_file_results(file_contents: list[tuple[str, bytes]], digests: list[str],
+                     cache: IngestCache | None = None,
+                     executor: Executor | None = None) -> list[tuple[pd.DataFrame | None, FileDiagnostic]]:
+    """
+    Ingest results for each file, in input order. Cache misses are processed
+    together, in parallel when an executor is given.
+    """
+    results = [cache.get(digest) if cache is not None else None for digest in digests]
+    missing = [i for i, result in enumerate(results) if result is None]
+    
+    fresh = process_files([file_contents[i] for i in missing], executor=executor)
+    for i, result in zip(missing, fresh):
+        if cache is not None:
+            cache.put(digests[i], *result)
+        results[i] = result
+    return results
+
+
+def drop_duplicates(results: list[tuple[pd.DataFrame | None, FileDiagnostic]],
+                    existing: pd.DataFrame | None = None) -> list[tuple[pd.DataFrame | None, FileDiagnostic]]:
+    """Remove transactions repeated across files, recording the count on each file's diagnostic."""
+    loaded = [i for i, (normalized_df, _) in enumerate(results) if normalized_df is not None]
+    frames, dropped = drop_duplicate_transactions([results[i][0] for i in loaded], existing=existing)
+    results = list(results)
+    for i, frame, count in zip(loaded, frames, dropped):
+        results[i] = (frame, replace(results[i][1], duplicates=count))
+    return results
+
+
+def ingest_files(file_contents: list[tuple[str, bytes]], digests: list[str] | None = None,
+                 cache: IngestCache | None = None, executor: Executor | None = None,
+                 dedup: bool = DEDUP_ENABLED,
+                 rules: CategoryRules | None = DEFAULT_CATEGORY_RULES) -> IngestResult:
+    """
+    Load and process multiple CSV files, each given as (name, bytes or file path).
+    
+    CRITICAL: Each file is normalized INDEPENDENTLY before merging.
+    This prevents schema conflicts from causing data loss.
+    Transactions present in more than one file are kept once unless dedup is False.
+    The merged data is sorted by date (stably, so same-day rows keep file order).
+    The merged data is categorized with `rules`; pass None to leave that to the
+    caller (e.g. to cache it separately per rule set).
+    """
+    if digests is None:
+        with stage('hash', rows=len(file_contents)):
+            digests = [source_digest(filename, content) for filename, content in file_contents]
+    with stage('ingest_files', rows=len(file_contents)):
+        results = get_file_results(file_contents, digests, cache, executor)
+    if dedup and len(results) > 1:
+        with stage('dedup', rows=sum(len(df) for df, _ in results if df is not None)):
+            results = drop_duplicates(results)
+    
+    normalized_dfs = [normalized_df for normalized_df, _ in results if normalized_df is not None]
+    diagnostics = [diagnostic for _, diagnostic in results]
+    
+    # MERGE - All dataframes now have identical columns (derived ones included)
+    with stage('merge', rows=sum(len(df) for df in normalized_dfs)):
+        data = concat_transactions(normalized_dfs) if normalized_dfs else None
+    if data is not None:
+        # Kept in date order so DateIndex range queries are binary searches over the frame itself
+        with stage('sort', rows=len(data)):
+            data = sort_by_date(data)
+    if data is not None and rules is not None:
+        with stage('categorization', rows=len(data)):
+            data = categorize_transactions(data, rules)
+    return IngestResult(data, diagnostics, digests)
+
+
+def ingest_into_store(store: TransactionStore, file_contents: list[tuple[str, bytes]],
+                      digests: list[str], cache: IngestCache | None = None,
+                      executor: Executor | None = None, dedup: bool = DEDUP_ENABLED) -> list[FileDiagnostic]:
+    """
+    Append new files to the store; files already stored are skipped (no diagnostic).
+    New rows already in the store, or in an earlier new file, are not stored again.
+    Rows are stored uncategorized; categorize_transactions runs on read.
+    """
+    new_files = []
+    for (filename, content), digest in zip(file_contents, digests):
+        if digest not in store:
+            new_files.append((digest, (filename, content)))
+    
+    results = get_file_results([f for _, f in new_files], [d for d, _ in new_files], cache, executor)
+    if dedup and results:
+        # Compare against the stored years the new files touch (plus neighbours for date shifts)
+        with stage('dedup'):
+            years = {int(y) + offset for df, _ in results if df is not None
+                     for y in df['year'].unique() for offset in (-1, 0, 1)}
+            stored = [store.read_year(year) for year in sorted(years & set(store.years()))]
+            results = drop_duplicates(results, existing=concat_transactions(stored) if stored else None)
+    diagnostics = []
+    for (digest, (filename, _)), (normalized_df, diagnostic) in zip(new_files, results):
+        if normalized_df is not None:
+            store.append(digest, filename, normalized_df)
+        diagnostics.append(diagnostic)
+    return diagnostics
+
+
+def yearly_summary(cube: pd.DataFrame) -> pd.DataFrame:
+    """Income, expenses, net savings and transaction count per year."""
+    income = cube[cube['is_income']].groupby('year')['total'].sum()
+    expenses = -cube[~cube['is_income']].groupby('year')['total'].sum()
+    summary = pd.DataFrame({
+        'income': income, 'expenses': expenses,
+        'transactions': cube.groupby('year')['count'].sum()
+    }).fillna(0.0)
+    summary['net_savings'] = summary['income'] - summary['expenses']
+    summary[['income', 'expenses', 'net_savings']] = summary[['income', 'expenses', 'net_savings']].round(2)
+    summary['transactions'] = summary['transactions'].astype(int)
+    summary.index = summary.index.astype(int)
+    return summary.rename_axis('year').reset_index()[
+        ['year', 'income', 'expenses', 'net_savings', 'transactions']
+    ]
+
+
+def category_summary(cube: pd.DataFrame) -> pd.DataFrame:
+    """Expenses per year and category, largest first within each year."""
+    expenses = cube[~cube['is_income']].groupby(['year', 'processed_category'])['total'].sum()
+    summary = (-expenses).round(2).rename('expenses').reset_index()
+    return summary.sort_values(['year', 'expenses'], ascending=[True, False], ignore_index=True)
+
+
+def summarize(data: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(yearly summary, per-category summary) for a combined dataset."""
+    cube = build_aggregate_cube(data)
+    return yearly_summary(cube), category_summary(cube)
@@ -0,0 +1,324 @@
+"""Read statement files: layout detection, one-shot and chunked streaming reads."""
+import codecs
+import contextlib
+import csv
+import io
+import mmap
+import os
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from finance_core.compat import HAS_PYARROW, pa, pa_csv
+from finance_core.diagnostics import (
+    ERROR, LOADED, WARNING, FileDiagnostic, StageRecorder, recording, stage
+)
+from finance_core.formats import FormatRegistry, StatementFormat, get_format_registry, layout_fingerprint
+from finance_core.normalize import normalize_single_file, resolve_statement_format
+from finance_core.spool import mapped_file
+from finance_core.transactions import add_derived_columns, concat_transactions
+
+# ============================================================================
+# FILE READING - single-pass layout detection, optional chunked streaming
+# ============================================================================
+SNIFF_BYTES = 64 * 1024
+# Rows per chunk for streaming ingest; 0 reads each file in one piece
+STREAM_CHUNK_ROWS = int(os.environ.get('FINANCE_APP_STREAM_CHUNK_ROWS', '0'))
+# CSV parser: 'c' (pandas default) or 'pyarrow'
+CSV_ENGINE = os.environ.get('FINANCE_APP_CSV_ENGINE', 'c')
+DELIMITERS = [',', ';', '\t', '|']
+# Lines of the prefix a delimiter must split consistently
+SNIFF_LINES = 10
+
+
+@dataclass(frozen=True)
+class StatementLayout:
+    """How to parse a file; for headerless files column_names are the names to assign."""
+    encoding: str
+    delimiter: str
+    column_names: list[str]
+    headerless: bool
+    fingerprint: str
+
+
+def looks_headerless(columns: list) -> bool:
+    """Heuristic: if column names look like dates or amounts, it's headerless."""
+    for col in list(columns)[:3]:
+        col_str = str(col)
+        if '/' in col_str or col_str.replace('.', '').replace('-', '').isdigit():
+            return True
+    return False
+
+
+def headerless_column_names(num_cols: int) -> list[str]:
+    """Generic column names for files without a header row."""
+    if num_cols >= 3:
+        return ['Transaction Date', 'Description', 'Amount'] + \
+               [f'Col_{i}' for i in range(3, num_cols)]
+    elif num_cols == 2:
+        return ['Transaction Date', 'Amount']
+    return [f'Col_{i}' for i in range(num_cols)]
+
+
+def detect_encoding(data: bytes, final: bool = True) -> str:
+    """
+    Return 'utf-8' if the bytes decode cleanly, else 'latin-1'.
+    Decodes in slices so no full-size string is built; with final=False a
+    multi-byte character cut off at the end of a prefix is tolerated.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    # Released explicitly so a memory-mapped `data` can be closed afterwards
+    with memoryview(data) as view:
+        try:
+            for start in range(0, len(view), 1 << 20):
+                decoder.decode(view[start:start + (1 << 20)])
+            decoder.decode(b'', final=final)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'latin-1'  # never fails, so cp1252 was never reached before either
+
+
+def detect_stream_encoding(handle) -> str:
+    """detect_encoding over a whole seekable binary stream, read in slices; rewinds it afterwards."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while chunk := handle.read(1 << 20):
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+    finally:
+        handle.seek(0)
+
+
+def _delimiters_per_record(sample: str, delimiter: str) -> list[int]:
+    """Occurrences of a delimiter outside quoted fields, per record of the sample."""
+    counts, count, quoted = [], 0, False
+    for char in sample:
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == delimiter:
+            count += 1
+        elif char == '\n':
+            counts.append(count)
+            count = 0
+    return counts
+
+
+def detect_delimiter(sample: str) -> str:
+    """
+    The one of DELIMITERS that splits every record of the sample (complete
+    lines) into the same number of fields, the most fields if several do;
+    delimiters inside quoted fields don't count. Comma when none does.
+    """
+    best, best_count = ',', 0
+    for delimiter in DELIMITERS:
+        counts = set(_delimiters_per_record(sample, delimiter))
+        if len(counts) == 1 and (count := counts.pop()) > best_count:
+            best, best_count = delimiter, count
+    return best
+
+
+def sniff_statement_layout(data: bytes, final: bool = True, encoding: str | None = None) -> StatementLayout:
+    """
+    Detect encoding, delimiter and header layout without parsing the whole
+    file. Pass `encoding` when it was already detected over the whole file.
+    """
+    encoding = encoding or detect_encoding(data, final=final)
+    prefix = bytes(data[:SNIFF_BYTES]).decode(encoding, errors='replace').lstrip('\ufeff')
+    lines = prefix.splitlines()[:-1] if len(data) > SNIFF_BYTES else prefix.splitlines()  # last may be cut short
+    lines = [line for line in lines if line.strip()][:SNIFF_LINES]
+    delimiter = detect_delimiter(''.join(f"{line}\n" for line in lines))
+    first_row = next((row for row in csv.reader(io.StringIO(prefix), delimiter=delimiter) if row), [])
+    headerless = looks_headerless(first_row)
+    return StatementLayout(
+        encoding, delimiter,
+        headerless_column_names(len(first_row)) if headerless else first_row,
+        headerless, layout_fingerprint(first_row, encoding, delimiter, headerless)
+    )
+
+
+def known_layout(layout: StatementLayout,
+                 registry: FormatRegistry | None) -> tuple[StatementLayout, StatementFormat | None]:
+    """Look the layout up in the format registry; known headerless formats bring their column names."""
+    fmt = registry.lookup(layout.fingerprint) if registry is not None else None
+    if fmt is not None and fmt.column_names is not None and layout.headerless \
+            and len(fmt.column_names) == len(layout.column_names):
+        layout = replace(layout, column_names=list(fmt.column_names))
+    return layout, fmt
+
+
+def learn_format(df: pd.DataFrame, layout: StatementLayout, registry: FormatRegistry | None) -> StatementFormat:
+    """
+    Resolve an unknown layout with the heuristics and remember it for next
+    time, named after its fingerprint since any file with this layout shares it.
+    """
+    with stage('resolve_format', rows=len(df)):
+        fmt = resolve_statement_format(df, name=f"learned: {layout.fingerprint[:12]}")
+    if layout.headerless:
+        fmt = replace(fmt, column_names=tuple(layout.column_names))
+    if registry is not None and fmt.learnable:
+        registry.learn(layout.fingerprint, fmt)
+    return fmt
+
+
+def read_statement_csv(content, engine: str = CSV_ENGINE,
+                       layout: StatementLayout | None = None) -> pd.DataFrame | None:
+    """
+    Decode a statement CSV (bytes or a file path) in a single parse, detecting
+    encoding and headerless layouts. Paths are memory-mapped rather than read.
+    """
+    use_pyarrow = engine == 'pyarrow' and HAS_PYARROW
+    with mapped_file(content) as data:
+        layout = layout or sniff_statement_layout(data)
+        mapped = isinstance(data, mmap.mmap)
+    # pandas only decodes files it maps itself; pyarrow reads paths natively
+    df = pd.read_csv(
+        content if mapped else io.BytesIO(data), encoding=layout.encoding, sep=layout.delimiter,
+        header=None if layout.headerless else 'infer',
+        names=layout.column_names if layout.headerless else None,
+        engine='pyarrow' if use_pyarrow else 'c',
+        **({'memory_map': True} if mapped and not use_pyarrow else {})
+    )
+    if df.empty:
+        return None
+    return df
+
+
+def read_csv_chunks(handle, layout: StatementLayout, chunk_rows: int,
+                    engine: str = CSV_ENGINE, bytes_per_row: int = 128):
+    """Yield raw DataFrame chunks of roughly chunk_rows rows from a binary file handle."""
+    if engine == 'pyarrow' and HAS_PYARROW:
+        # pandas' pyarrow engine can't chunk, so use pyarrow's streaming reader directly.
+        # Everything is read as text; normalize_single_file does the typing.
+        read_options = pa_csv.ReadOptions(
+            encoding=layout.encoding, block_size=max(1 << 20, chunk_rows * bytes_per_row),
+            column_names=layout.column_names if layout.headerless else None
+        )
+        convert_options = pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in layout.column_names}
+        )
+        with pa_csv.open_csv(handle, read_options=read_options,
+                             parse_options=pa_csv.ParseOptions(delimiter=layout.delimiter),
+                             convert_options=convert_options) as reader:
+            for batch in reader:
+                if batch.num_rows:
+                    yield batch.to_pandas()
+        return
+    
+    yield from pd.read_csv(
+        handle, encoding=layout.encoding, chunksize=chunk_rows,
+        sep=layout.delimiter, header=None if layout.headerless else 'infer',
+        names=layout.column_names if layout.headerless else None
+    )
+
+
+def iter_statement_chunks(source, filename: str, chunk_rows: int = STREAM_CHUNK_ROWS or 100_000,
+                          engine: str = CSV_ENGINE, registry: FormatRegistry | None = None,
+                          formats_used: list | None = None):
+    """
+    Stream one statement file (path, bytes or binary file object) in fixed-size
+    chunks, yielding the normalized valid rows of each chunk with derived columns.
+    Peak memory scales with chunk_rows rather than file size. The layout is
+    resolved once (from the registry, else from the first chunk) for all chunks;
+    its format is appended to formats_used if given.
+    """
+    if registry is None:
+        registry = get_format_registry()
+    with contextlib.ExitStack() as stack:
+        if isinstance(source, (str, os.PathLike)):
+            handle = stack.enter_context(open(source, 'rb'))
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            handle = io.BytesIO(source)
+        else:
+            handle = source
+        
+        # The encoding is decided over the whole file: a latin-1 byte past the
+        # sniffed prefix would otherwise fail the parse (pyarrow) or be mangled
+        if isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+            with mapped_file(source) as data:
+                encoding = detect_encoding(data)
+        else:
+            encoding = detect_stream_encoding(handle)
+        prefix = handle.read(SNIFF_BYTES)
+        handle.seek(0)
+        layout, fmt = known_layout(sniff_statement_layout(prefix, encoding=encoding), registry)
+        bytes_per_row = max(16, len(prefix) // max(1, prefix.count(b'\n')))
+        
+        chunks = read_csv_chunks(handle, layout, chunk_rows, engine, bytes_per_row)
+        while True:
+            with stage('decode'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            if fmt is None:
+                fmt = learn_format(chunk, layout, registry)
+                if formats_used is not None:
+                    formats_used.append(fmt)
+            elif formats_used is not None and not formats_used:
+                formats_used.append(fmt)
+            normalized_df = normalize_single_file(chunk, filename, fmt)
+            with stage('filter', rows=len(normalized_df)):
+                valid_rows = normalized_df['date'].notna() & (normalized_df['amount'] != 0)
+            if valid_rows.any():
+                with stage('derive', rows=int(valid_rows.sum())):
+                    normalized_df = add_derived_columns(normalized_df[valid_rows].reset_index(drop=True))
+                yield normalized_df
+
+
+def process_statement_file(filename: str, content) -> tuple[pd.DataFrame | None, FileDiagnostic]:
+    """
+    Read, normalize and filter one statement file, given as bytes or as a path
+    (e.g. a spooled upload).
+    Returns the valid transactions (with derived columns) or None, plus a
+    diagnostic that carries the file's per-stage timings.
+    """
+    recorder = StageRecorder()
+    formats_used = []
+    with recording(recorder):
+        normalized_df, status, message = _process_statement_file(filename, content, formats_used)
+    rows = 0 if normalized_df is None else len(normalized_df)
+    format_name = formats_used[0].name if formats_used else ''
+    return normalized_df, FileDiagnostic(filename, status, rows, message, recorder.summary(), format=format_name)
+
+
+def _process_statement_file(filename: str, content,
+                            formats_used: list) -> tuple[pd.DataFrame | None, str, str]:
+    try:
+        registry = get_format_registry()
+        if STREAM_CHUNK_ROWS > 0:
+            chunks = list(iter_statement_chunks(content, filename, STREAM_CHUNK_ROWS,
+                                                registry=registry, formats_used=formats_used))
+            if not chunks:
+                return None, WARNING, "No valid transactions found"
+            with stage('merge_chunks'):
+                return concat_transactions(chunks), LOADED, ''
+        
+        with mapped_file(content) as data:
+            layout, fmt = known_layout(sniff_statement_layout(data), registry)
+        with stage('decode'):
+            df = read_statement_csv(content, layout=layout)
+        if df is None:
+            return None, WARNING, "Could not read file or file is empty"
+        
+        # NORMALIZE THIS FILE to target schema: directly for known layouts
+        fmt = fmt or learn_format(df, layout, registry)
+        formats_used.append(fmt)
+        normalized_df = normalize_single_file(df, filename, fmt)
+        
+        # Drop rows with invalid dates or zero amounts
+        with stage('filter', rows=len(normalized_df)):
+            valid_rows = normalized_df['date'].notna() & (normalized_df['amount'] != 0)
+            normalized_df = normalized_df[valid_rows]
+        
+        if len(normalized_df) == 0:
+            return None, WARNING, "No valid transactions found"
+        with stage('derive', rows=len(normalized_df)):
+            normalized_df = add_derived_columns(normalized_df.reset_index(drop=True))
+        return normalized_df, LOADED, ''
+    
+    except Exception as e:
+        return None, ERROR, str(e)
@@ -0,0 +1,111 @@
+"""
+Upload spooling: each upload is copied once to a temporary file and hashed in
+the same pass. Later reads memory-map the file, so a rerun with unchanged
+uploads touches no file bytes, and worker processes receive a path instead
+of a pickled copy of the content.
+"""
+import contextlib
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from dataclasses import dataclass
+
+from finance_core.cache import file_digest
+
+# Parent directory for spooled uploads (default: the system temp directory)
+SPOOL_DIR = os.environ.get('FINANCE_APP_SPOOL_DIR') or None
+SPOOL_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class SpooledFile:
+    """An upload on disk; digest equals cache.file_digest(name, content)."""
+    name: str
+    path: str
+    size: int
+    digest: str
+
+
+@contextlib.contextmanager
+def mapped_file(source):
+    """
+    Bytes-like, read-only view of a statement: a memory map of a file path,
+    or `source` itself if it already holds the bytes.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield source
+        return
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''  # mmap can't map an empty file
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def source_digest(filename: str, source) -> str:
+    """cache.file_digest for bytes or for a file path, hashing the file through a memory map."""
+    with mapped_file(source) as data:
+        return file_digest(filename, data)
+
+
+def spool_file(name: str, stream, directory: str | None = SPOOL_DIR) -> SpooledFile:
+    """Copy a binary stream to a new temporary file, hashing it on the way."""
+    hasher = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix='upload_', suffix='.csv', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while chunk := stream.read(SPOOL_CHUNK_BYTES):
+                hasher.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    hasher.update(name.encode('utf-8'))
+    return SpooledFile(name, path, size, hasher.hexdigest())
+
+
+class UploadSpool:
+    """
+    Spooled uploads for one session, keyed by upload id, in a private temp
+    directory that is removed with the spool (or on interpreter exit).
+    """
+    
+    def __init__(self, directory: str | None = SPOOL_DIR):
+        self.directory = tempfile.mkdtemp(prefix='finance_app_spool_', dir=directory)
+        self._files = {}
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+    
+    def sync(self, uploads: list[tuple[str, str, object]]) -> list[SpooledFile]:
+        """
+        Spooled files for (upload id, name, stream) triples, in order. Only
+        uploads not seen before are read; files for uploads no longer
+        present are deleted.
+        """
+        with self._lock:
+            spooled = []
+            for upload_id, name, stream in uploads:
+                if upload_id not in self._files:
+                    stream.seek(0)
+                    self._files[upload_id] = spool_file(name, stream, self.directory)
+                    stream.seek(0)
+                spooled.append(self._files[upload_id])
+            
+            current = {upload_id for upload_id, _, _ in uploads}
+            for upload_id in [k for k in self._files if k not in current]:
+                with contextlib.suppress(OSError):
+                    os.unlink(self._files.pop(upload_id).path)
+            return spooled
+    
+    def close(self) -> None:
+        """Delete every spooled file now."""
+        with self._lock:
+            self._files.clear()
+            self._finalizer()
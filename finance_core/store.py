@@ -0,0 +1,88 @@
+"""Optional persistent Parquet store of processed transactions, partitioned by year."""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from finance_core.compat import pa, pq
+from finance_core.transactions import concat_transactions
+
+
+class TransactionStore:
+    """
+    On-disk store of processed transactions: one Parquet file per
+    (ingested file, year) under <root>/<year>/, plus a manifest of ingested files.
+    Requires pyarrow.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self._manifest_path = os.path.join(root, 'manifest.json')
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._manifest = self._read_manifest()
+    
+    def _read_manifest(self) -> dict:
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_atomic(self, path: str, write) -> None:
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._manifest
+    
+    def append(self, digest: str, filename: str, frame: pd.DataFrame) -> None:
+        """Add one file's processed rows; files already in the store are skipped."""
+        with self._lock:
+            if digest in self._manifest:
+                return
+            for year, part in frame.groupby('year', sort=True):
+                year_dir = os.path.join(self.root, str(int(year)))
+                os.makedirs(year_dir, exist_ok=True)
+                table = pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+                self._write_atomic(os.path.join(year_dir, f"{digest}.parquet"),
+                                   lambda path: pq.write_table(table, path))
+            self._manifest[digest] = {
+                'filename': filename, 'rows': len(frame),
+                'years': sorted(int(y) for y in frame['year'].unique())
+            }
+            def write_manifest(path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(self._manifest, f, indent=2)
+            self._write_atomic(self._manifest_path, write_manifest)
+    
+    def years(self) -> list[int]:
+        with self._lock:
+            return sorted({year for entry in self._manifest.values() for year in entry['years']})
+    
+    def total_rows(self) -> int:
+        with self._lock:
+            return sum(entry['rows'] for entry in self._manifest.values())
+    
+    def file_count(self) -> int:
+        with self._lock:
+            return len(self._manifest)
+    
+    def partition_files(self, year: int) -> list[str]:
+        """Parquet files making up one year's partition, in a stable order."""
+        with self._lock:
+            digests = sorted(d for d, entry in self._manifest.items() if year in entry['years'])
+        return [os.path.join(self.root, str(year), f"{d}.parquet") for d in digests]
+    
+    def read_year(self, year: int) -> pd.DataFrame:
+        """Memory-map and read only the partition for one year."""
+        return read_partition(self.partition_files(year))
+
+
+def read_partition(paths: list[str]) -> pd.DataFrame:
+    """Memory-map and concatenate the given Parquet partition files."""
+    frames = [pq.read_table(path, memory_map=True).to_pandas() for path in paths]
+    if not frames:
+        return pd.DataFrame()
+    return concat_transactions(frames)
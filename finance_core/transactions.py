@@ -0,0 +1,80 @@
+"""
+Compact in-memory representation of processed transactions.
+
+Repeated strings are stored as categoricals, year/month as small integers,
+and amounts optionally as integer cents. abs_amount and month_name are not
+stored; use abs_amounts() and month_names() when they are needed.
+"""
+import calendar
+import os
+
+import numpy as np
+import pandas as pd
+
+# Store amounts as int64 cents in 'amount_cents' instead of float dollars in 'amount'
+AMOUNT_CENTS = os.environ.get('FINANCE_APP_AMOUNT_CENTS', '').lower() in ('1', 'true', 'yes')
+
+# String columns with many repeated values (merchants, categories, file names)
+CATEGORICAL_COLUMNS = ['description', 'category', 'processed_category', 'source_file']
+
+MONTH_NAMES = pd.Series(list(calendar.month_name)[1:], index=range(1, 13))
+
+
+def add_derived_columns(df: pd.DataFrame, amount_cents: bool = AMOUNT_CENTS) -> pd.DataFrame:
+    """Add year/month/income columns and convert the frame to the compact layout."""
+    df['year'] = df['date'].dt.year.astype('int16')
+    df['month'] = df['date'].dt.month.astype('int8')
+    df['is_income'] = df['amount'] > 0
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if amount_cents:
+        cents = np.round(df['amount'].to_numpy() * 100).astype('int64')
+        df = df.drop(columns='amount')
+        df.insert(2, 'amount_cents', cents)
+    return df
+
+
+def concat_transactions(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate compact frames, unioning categories first so categorical
+    columns stay categorical instead of falling back to object.
+    """
+    if len(frames) == 1:
+        return frames[0].copy()
+    
+    aligned = [frame.copy(deep=False) for frame in frames]
+    for col in CATEGORICAL_COLUMNS:
+        if not all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)
+                   for frame in frames):
+            continue
+        categories = pd.Index(pd.unique(np.concatenate(
+            [frame[col].cat.categories.to_numpy(dtype=object) for frame in frames]
+        )))
+        for frame in aligned:
+            frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(aligned, ignore_index=True)
+
+
+def amounts(df: pd.DataFrame) -> pd.Series:
+    """Signed amounts in dollars, whichever representation the frame uses."""
+    if 'amount_cents' in df.columns:
+        return df['amount_cents'] / 100
+    return df['amount']
+
+
+def abs_amounts(df: pd.DataFrame) -> pd.Series:
+    """Absolute amounts in dollars (formerly the stored abs_amount column)."""
+    return amounts(df).abs()
+
+
+def amount_total(df: pd.DataFrame) -> float:
+    """Sum of amounts in dollars; exact when amounts are stored as cents."""
+    if 'amount_cents' in df.columns:
+        return int(df['amount_cents'].sum()) / 100
+    return float(df['amount'].sum())
+
+
+def month_names(months: pd.Series) -> pd.Series:
+    """Month names for month numbers (formerly the stored month_name column)."""
+    return months.astype(int).map(MONTH_NAMES)
@@ -0,0 +1,70 @@
+"""
+Spending trends: expense totals per day or week over the whole dataset, and
+min/max downsampling so long ranges plot with a bounded number of points per
+trace while keeping every spike visible.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from finance_core.transactions import amounts
+
+# Upper bound on points per plotted trend figure, shared between its lines
+TREND_MAX_POINTS = int(os.environ.get('FINANCE_APP_TREND_MAX_POINTS', '5000'))
+TREND_FREQUENCIES = {'D': 'Daily', 'W': 'Weekly'}
+
+
+def period_starts(dates: np.ndarray, freq: str) -> np.ndarray:
+    """Day ('D') or Monday of the week ('W') for each date, as datetime64[D]."""
+    days = dates.astype('datetime64[D]')
+    if freq == 'W':
+        # 1970-01-01 was a Thursday, so day number + 3 is 0 on Mondays (mod 7)
+        day_numbers = days.astype('int64')
+        days = (day_numbers - (day_numbers + 3) % 7).astype('datetime64[D]')
+    return days
+
+
+def spending_trend(data: pd.DataFrame, freq: str = 'D', by_category: bool = False) -> pd.DataFrame:
+    """
+    Expenses (positive) per period, one column per category or a single
+    'Total' column. Every period in the range is present, zero when empty.
+    """
+    expenses = ~data['is_income'].to_numpy()
+    frame = pd.DataFrame({
+        'period': period_starts(data['date'].to_numpy()[expenses], freq),
+        'spending': -amounts(data).to_numpy()[expenses],
+    })
+    if by_category:
+        frame['category'] = data['processed_category'].to_numpy()[expenses]
+        trend = frame.groupby(['period', 'category'], observed=True)['spending'].sum().unstack(fill_value=0.0)
+    else:
+        trend = frame.groupby('period')['spending'].sum().to_frame('Total')
+    if trend.empty:
+        return trend
+    
+    step = np.timedelta64(7 if freq == 'W' else 1, 'D')
+    full_range = np.arange(trend.index.min(), trend.index.max() + step, step)
+    return trend.reindex(full_range, fill_value=0.0).rename_axis('period')
+
+
+def downsample_minmax(x: np.ndarray, y: np.ndarray,
+                      max_points: int = TREND_MAX_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """
+    At most max_points points of an x-sorted series: the minimum and maximum
+    of each of about max_points // 2 equal-size buckets, in x order.
+    """
+    if len(y) <= max_points:
+        return x, y
+    
+    size = -(-len(y) // max(1, max_points // 2))  # rows per bucket, rounded up
+    buckets = -(-len(y) // size)
+    offsets = np.arange(buckets) * size
+    # One row per bucket; padding never wins the min or the max
+    padded = np.full(buckets * size, np.inf)
+    padded[:len(y)] = y
+    lowest = offsets + padded.reshape(buckets, size).argmin(axis=1)
+    padded[len(y):] = -np.inf
+    highest = offsets + padded.reshape(buckets, size).argmax(axis=1)
+    keep = np.unique(np.concatenate([lowest, highest]))
+    return x[keep], y[keep]
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from finance_core.cache import SharedDatasetCache, freeze_frame, value_buffers
+from finance_core.pipeline import IngestResult
+
+
+def test_value_buffers_of_frozen_object_column():
+    frame = pd.DataFrame({'description': ['COFFEE', 'GROCERIES', 'RENT'], 'amount': [-4.5, -80.0, -1500.0]})
+    expected = frame.memory_usage(deep=True, index=False).sum()
+    freeze_frame(frame)
+    # A shallow copy takes fresh column views of the read-only blocks
+    buffers = value_buffers(frame.copy(deep=False))
+    assert sum(buffers.values()) >= expected
+
+
+def test_shared_cache_accepts_object_columns():
+    cache = SharedDatasetCache()
+    frame = cache.get_or_build('ingested', 'k', lambda: pd.DataFrame({'description': ['A', 'B'], 'amount': [1.0, 2.0]}))
+    derived = cache.get_or_build('categorized', 'k', lambda: frame.assign(processed_category=['X', 'Y']))
+    assert list(derived.columns) == ['description', 'amount', 'processed_category']
+    assert cache.stats()['entries'] == 2
+
+
+def test_views_of_shared_results_are_read_only():
+    cache = SharedDatasetCache()
+    source = pd.DataFrame({'description': ['A', 'B'], 'amount': [1.0, 2.0]})
+    source['amount'].to_numpy()  # a column view pandas caches before the frame is frozen
+    view = cache.get_or_build('ingested', 'k', lambda: IngestResult(data=source))
+    with pytest.raises(ValueError):
+        view.data['amount'].to_numpy()[0] = 12345
+    view.data['extra'] = 1
+    shared = cache.get_or_build('ingested', 'k', lambda: None)
+    assert shared.data['amount'].tolist() == [1.0, 2.0]
+    assert 'extra' not in shared.data